@@ -31,22 +31,29 @@ class Ad_array:
         self.jac = jac
 
     def __add__(self, other):
-        b = _cast(other)
+        if not isinstance(other, Ad_array):
+            # The Jacobian of a constant is zero, only the value is modified.
+            return Ad_array(self.val + other, self._copy_jac())
         c = Ad_array()
-        c.val = self.val + b.val
-        c.jac = self.jac + b.jac
+        c.val = self.val + other.val
+        c.jac = self.jac + other.jac
         return c
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __sub__(self, other):
-        b = _cast(other).copy()
+        if not isinstance(other, Ad_array):
+            # No need to negate (and copy) the zero Jacobian of a constant
+            return Ad_array(self.val - other, self._copy_jac())
+        b = other.copy()
         b.val = -b.val
         b.jac = -b.jac
         return self + b
 
     def __rsub__(self, other):
+        if not isinstance(other, Ad_array):
+            return Ad_array(other - self.val, -self.jac)
         return -self.__sub__(other)
 
     def __mul__(self, other):
@@ -111,6 +118,12 @@ class Ad_array:
             b.jac = self.jac
         return b
 
+    def _copy_jac(self):
+        try:
+            return self.jac.copy()
+        except AttributeError:
+            return self.jac
+
     def diagvec_mul_jac(self, a):
         try:
             A = sps.diags(a)
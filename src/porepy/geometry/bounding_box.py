@@ -1,6 +1,7 @@
 """
 Compute bounding boxes of geometric objects.
 """
+import numpy as np
 
 
 def from_points(pts, overlap=0):
@@ -31,3 +32,26 @@ def from_points(pts, overlap=0):
         domain["zmin"] = min_coord[2] - dx[2] * overlap
         domain["zmax"] = max_coord[2] + dx[2] * overlap
     return domain
+
+
+def from_point_sets(point_sets):
+    """Obtain bounding boxes for a list of point clouds.
+
+    The boxes are computed jointly for all the point clouds, which is faster than
+    calling from_points for each of them.
+
+    Parameters:
+        point_sets (list of np.ndarray, each nd x npt): Point clouds. All must have
+            the same dimension nd, and contain at least one point.
+
+    Returns:
+        np.ndarray, nd x num_sets: Minimum coordinates of each point cloud.
+        np.ndarray, nd x num_sets: Maximum coordinates of each point cloud.
+
+    """
+    # Index of the first point of each point cloud in the joint array
+    offsets = np.cumsum([0] + [pts.shape[1] for pts in point_sets[:-1]])
+    all_pts = np.hstack(point_sets)
+    min_coord = np.minimum.reduceat(all_pts, offsets, axis=1)
+    max_coord = np.maximum.reduceat(all_pts, offsets, axis=1)
+    return min_coord, max_coord
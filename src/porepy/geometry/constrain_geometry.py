@@ -2,21 +2,27 @@
 
 Examples are to cut objects to lie within other objects, etc.
 """
+import numba
 import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.csgraph
+import scipy.spatial
 
 import porepy as pp
 
 
-def lines_by_polygon(poly_pts, pts, edges):
+def lines_by_polygon(poly_pts, pts, edges, tol=1e-8):
     """
     Compute the intersections between a polygon (also not convex) and a set of lines.
-    The computation is done line by line to avoid the splitting of edges caused by other
+    Each line is treated separately to avoid the splitting of edges caused by other
     edges. The implementation assume that the polygon and lines are on the plane (x, y).
 
     Parameters:
     poly_pts (np.ndarray, 3xn or 2xn): the points that define the polygon
     pts (np.ndarray, 3xn or 2xn): the points associated to the lines
     edges (np.ndarray, 2xn): for each column the id of the points for the line
+    tol (double, optional): Geometric tolerance, used to identify parts of the lines
+        that lie on the boundary of the polygon. Defaults to 1e-8.
 
     Returns:
     int_pts (np.ndarray, 2xn): the point associated to the lines after the intersection
@@ -27,59 +33,156 @@ def lines_by_polygon(poly_pts, pts, edges):
         values if an edge is cut by a non-convex domain.
 
     """
-    import shapely.geometry as shapely_geometry
-    import shapely.speedups as shapely_speedups
-
-    try:
-        shapely_speedups.enable()
-    except AttributeError:
-        pass
-    # it stores the points after the intersection
-    int_pts = np.empty((2, 0))
-    # define the polygon
-    poly = shapely_geometry.Polygon(poly_pts[:2, :].T)
-
-    # Kept edges
-    edges_kept = []
-
-    # we do the computation for each edge once at time, to avoid the splitting
-    # caused by other edges.
-    for ei, e in enumerate(edges.T):
-        # define the line
-        line = shapely_geometry.LineString([pts[:2, e[0]], pts[:2, e[1]]])
-        # compute the intersections between the polygon and the current line
-        int_lines = poly.intersection(line)
-        # only line or multilines are considered, no points
-        if (
-            isinstance(int_lines, shapely_geometry.LineString)
-            and len(int_lines.coords) > 0
-        ):
-            # consider the case of single intersection by avoiding to consider
-            # lines on the boundary of the polygon
-            if not int_lines.touches(poly) and int_lines.length > 0:
-                int_pts = np.c_[int_pts, np.array(int_lines.xy)]
-                edges_kept.append(ei)
-        elif type(int_lines) is shapely_geometry.MultiLineString:
-            # consider the case of multiple intersections by avoiding to consider
-            # lines on the boundary of the polygon
-            for int_line in int_lines:
-                if not int_line.touches(poly) and int_line.length > 0:
-                    int_pts = np.c_[int_pts, np.array(int_line.xy)]
-                    edges_kept.append(ei)
+    # Start and end points of the lines, and of the polygon sides
+    start = pts[:2, edges[0]].astype(np.float64)
+    end = pts[:2, edges[1]].astype(np.float64)
+    side_start = poly_pts[:2].astype(np.float64)
+    side_end = np.roll(side_start, -1, axis=1)
+
+    num_lines = edges.shape[1]
+    num_sides = side_start.shape[1]
+
+    line_vec = end - start
+    side_vec = side_end - side_start
+    line_length = np.sqrt(np.sum(line_vec ** 2, axis=0))
+
+    # Parametrize the lines as start + t * line_vec, and find the values of t where
+    # the lines cross the polygon sides, which are parametrized by u. Rows correspond
+    # to lines, columns to sides.
+    dx = side_start[0] - start[0].reshape((-1, 1))
+    dy = side_start[1] - start[1].reshape((-1, 1))
+    denom = (
+        line_vec[0].reshape((-1, 1)) * side_vec[1]
+        - line_vec[1].reshape((-1, 1)) * side_vec[0]
+    )
+    cross_side = dx * side_vec[1] - dy * side_vec[0]
+    cross_line = dx * line_vec[1].reshape((-1, 1)) - dy * line_vec[0].reshape((-1, 1))
+
+    # Lines and sides are considered parallel if the sine of the angle between them
+    # is small.
+    side_length = np.sqrt(np.sum(side_vec ** 2, axis=0))
+    scale = line_length.reshape((-1, 1)) * side_length
+    parallel = np.abs(denom) <= tol * scale
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = cross_side / denom
+        u = cross_line / denom
+    # Tolerance for the line parameters
+    tol_t = tol / np.maximum(line_length, tol).reshape((-1, 1))
+    tol_u = tol / np.maximum(side_length, tol)
+    crossing = np.logical_and.reduce(
+        (
+            np.logical_not(parallel),
+            t >= -tol_t,
+            t <= 1 + tol_t,
+            u >= -tol_u,
+            u <= 1 + tol_u,
+        )
+    )
+    t_cross = np.where(crossing, np.clip(t, 0, 1), np.nan)
+
+    # For parallel sides on the line, the endpoints of the side split the line
+    with np.errstate(divide="ignore", invalid="ignore"):
+        collinear = np.logical_and(
+            parallel, np.abs(cross_line) <= tol * line_length.reshape((-1, 1))
+        )
+        len2 = line_length.reshape((-1, 1)) ** 2
+        t_side_start = (
+            dx * line_vec[0].reshape((-1, 1)) + dy * line_vec[1].reshape((-1, 1))
+        ) / len2
+        t_side_end = (
+            t_side_start
+            + (
+                side_vec[0] * line_vec[0].reshape((-1, 1))
+                + side_vec[1] * line_vec[1].reshape((-1, 1))
+            )
+            / len2
+        )
+
+    def _on_line(t_side):
+        inside = np.logical_and.reduce(
+            (collinear, t_side >= -tol_t, t_side <= 1 + tol_t)
+        )
+        return np.where(inside, np.clip(t_side, 0, 1), np.nan)
+
+    # All splitting points of the lines, including the line endpoints, sorted
+    # along each line. Missing values are padded with nan, which is sorted last.
+    t_all = np.sort(
+        np.hstack(
+            (
+                np.zeros((num_lines, 1)),
+                np.ones((num_lines, 1)),
+                t_cross,
+                _on_line(t_side_start),
+                _on_line(t_side_end),
+            )
+        ),
+        axis=1,
+    )
+
+    # Sub-intervals of the lines between subsequent splitting points. Disregard
+    # intervals of zero length, and lines of zero length.
+    t_lo = t_all[:, :-1]
+    t_hi = t_all[:, 1:]
+    with np.errstate(invalid="ignore"):
+        valid = np.logical_and(
+            (t_hi - t_lo) > tol_t, line_length.reshape((-1, 1)) > tol
+        )
+    line_ind, _ = np.where(valid)
+    t_lo = t_lo[valid]
+    t_hi = t_hi[valid]
+
+    # Classify the intervals by their midpoints: Inside, on the boundary, or outside
+    # the polygon.
+    t_mid = 0.5 * (t_lo + t_hi)
+    mid = start[:, line_ind] + t_mid * line_vec[:, line_ind]
+
+    # Distance from the midpoints to the polygon sides
+    proj = (
+        (mid[0].reshape((-1, 1)) - side_start[0]) * side_vec[0]
+        + (mid[1].reshape((-1, 1)) - side_start[1]) * side_vec[1]
+    ) / np.maximum(side_length, tol) ** 2
+    proj = np.clip(proj, 0, 1)
+    dist = np.sqrt(
+        (side_start[0] + proj * side_vec[0] - mid[0].reshape((-1, 1))) ** 2
+        + (side_start[1] + proj * side_vec[1] - mid[1].reshape((-1, 1))) ** 2
+    )
+    if num_sides > 0 and mid.shape[1] > 0:
+        on_boundary = dist.min(axis=1) <= tol
+    else:
+        on_boundary = np.zeros(mid.shape[1], dtype=np.bool_)
+
+    inside = pp.geometry_property_checks.points_in_cell(
+        np.vstack((side_start, np.zeros(num_sides))),
+        np.vstack((mid, np.zeros(mid.shape[1]))),
+        if_make_planar=False,
+    )
+    inside = np.logical_and(inside, np.logical_not(on_boundary))
+
+    # Parts of the lines on the boundary of the polygon are not kept. If a line
+    # touches the polygon boundary from the inside, the two parts are kept as
+    # separate lines.
+    edges_kept = line_ind[inside]
+    t_kept = np.vstack((t_lo[inside], t_hi[inside]))
+
+    # Coordinates of the constrained lines, with the start and end of each line stored
+    # in subsequent columns.
+    int_pts = (
+        start[:, edges_kept].reshape((2, 1, -1))
+        + t_kept.reshape((1, 2, -1)) * line_vec[:, edges_kept].reshape((2, 1, -1))
+    ).reshape((2, -1), order="F")
 
     # define the list of edges
     int_edges = np.arange(int_pts.shape[1]).reshape((2, -1), order="F")
 
     # Also preserve tags, if any
-    if len(edges_kept) > 0:
-        edges_kept = np.array(edges_kept)
-        edges_kept.sort()
+    if edges_kept.size > 0:
         int_edges = np.vstack((int_edges, edges[2:, edges_kept]))
     else:
         # If no edges are kept, return an empty array with the right dimensions
-        int_edges = np.empty((edges.shape[0], 0), dtype=np.int)
+        int_edges = np.empty((edges.shape[0], 0), dtype=np.intp)
 
-    return int_pts, int_edges, np.array(edges_kept, dtype=np.int)
+    return int_pts, int_edges, edges_kept.astype(np.intp)
 
 
 def polygons_by_polyhedron(polygons, polyhedron, tol=1e-8):
@@ -102,50 +205,86 @@ def polygons_by_polyhedron(polygons, polyhedron, tol=1e-8):
             polygon
 
     """
-    import networkx as nx
-
     if isinstance(polygons, np.ndarray):
         polygons = [polygons]
 
     constrained_polygons = []
     orig_poly_ind = []
 
+    if len(polygons) == 0:
+        return constrained_polygons, np.array(orig_poly_ind)
+
+    # Test all polygon vertexes for inclusion in the polyhedron in one go, so that
+    # the polyhedron boundary is processed only once.
+    vertex_offsets = np.cumsum([0] + [poly.shape[1] for poly in polygons])
+    vertexes_inside_polyhedron = pp.geometry_property_checks.point_in_polyhedron(
+        polyhedron, np.hstack(polygons)
+    )
+
+    # Bounding boxes of the sides of the polyhedron and of the polygons. Only sides
+    # with a bounding box that overlaps with that of a polygon can intersect it.
+    side_min, side_max = pp.bounding_box.from_point_sets(polyhedron)
+    poly_min, poly_max = pp.bounding_box.from_point_sets(polygons)
+    # Overlap between side (first index) and polygon (second index)
+    overlaps = np.all(
+        np.logical_and(
+            side_min[:, :, np.newaxis] <= poly_max[:, np.newaxis, :] + tol,
+            side_max[:, :, np.newaxis] >= poly_min[:, np.newaxis, :] - tol,
+        ),
+        axis=0,
+    )
+
     # Loop over the polygons. For each, find the intersections with all
     # polygons on the side of the polyhedra.
     for pi, poly in enumerate(polygons):
-        # Add this polygon to the list of constraining polygons. Put this first
-        all_poly = [poly] + polyhedron
-
-        # Find intersections
-        coord, point_ind, _, _, seg_vert_all = pp.intersections.polygons_3d(
-            all_poly, target_poly=np.arange(1)
-        )
+        points_inside_polyhedron = vertexes_inside_polyhedron[
+            vertex_offsets[pi] : vertex_offsets[pi + 1]
+        ]
+
+        sides = np.flatnonzero(overlaps[:, pi])
+        if sides.size > 0:
+            # Add this polygon to the list of constraining polygons. Put this first
+            all_poly = [poly] + [polyhedron[si] for si in sides]
+
+            # Find intersections
+            coord, point_ind, _, _, seg_vert_all = pp.intersections.polygons_3d(
+                all_poly, target_poly=np.arange(1)
+            )
 
-        # Find indices of the intersection points for this polygon (the first one)
-        isect_poly = point_ind[0]
-        # Only consider segment-vertex information for the first polygon
-        seg_vert = seg_vert_all[0]
+            # Find indices of the intersection points for this polygon (the first
+            # one)
+            isect_poly = point_ind[0]
+            # Only consider segment-vertex information for the first polygon
+            seg_vert = seg_vert_all[0]
+
+            # For a polygon that shares a plane with one of the sides, polygons_3d
+            # does not identify the segments and vertexes of the intersection
+            # points, but gives a string instead. The constraining algorithm relies
+            # on this information, thus we cannot proceed.
+            if any(len(isect) > 0 and isinstance(isect[1], str) for isect in seg_vert):
+                raise NotImplementedError(
+                    "Polygons sharing a plane with a polyhedron side are not covered"
+                )
+        else:
+            # The bounding box of the polygon does not overlap with any of the
+            # sides, thus there can be no intersections.
+            isect_poly = np.zeros(0, dtype=np.intp)
 
         # If there are no intersection points, we just need to test if the
         # entire polygon is inside the polyhedral
         if isect_poly.size == 0:
-            # Testing with a single point should suffice, but until the code
-            # for in-polyhedron testing is more mature, we do some safeguarding:
-            # Test for all points in the polygon, they should all be on the
-            # inside or outside.
-            inside = pp.geometry_property_checks.point_in_polyhedron(polyhedron, poly)
-
-            if inside.all():
-                # Add the polygon to the constrained ones and continue
+            # Testing with a single point suffices.
+            inside = points_inside_polyhedron[0]
+            # Safeguarding: All points in the polygon should be on the same side,
+            # if not, this indicates that the inside_polyhedron test is bad. The
+            # classification of all vertexes is available anyhow, so this is cheap.
+            assert np.all(points_inside_polyhedron == inside)
+
+            if inside:
+                # Add the polygon to the constrained ones
                 constrained_polygons.append(poly)
                 orig_poly_ind.append(pi)
-                continue
-            elif np.all(np.logical_not(inside)):
-                # Do not add it.
-                continue
-            else:
-                # This indicates that the inside_polyhedron test is bad
-                assert False
+            continue
 
         # At this point we know there are intersections between the polygon and
         # polyhedra. The constrained polygon can have up to three types of segments:
@@ -161,202 +300,83 @@ def polygons_by_polyhedron(polygons, polyhedron, tol=1e-8):
         main_ind = point_ind[0]
 
         # Storage for intersection segments between the main polygon and the
-        # polyhedron sides.
-        boundary_segments = []
+        # polyhedron sides. Each side contributes at most one segment.
+        boundary_segments = np.empty((2, len(all_poly) - 1), dtype=np.int64)
+        num_boundary_segments = 0
+
+        # Mark the intersection points of the main polygon, for fast lookup
+        in_main = np.zeros(coord.shape[1], dtype=np.bool_)
+        in_main[main_ind] = True
 
         # First find segments fully on the boundary.
         # Loop over all sides of the polyhedral. Look for intersection points
         # that are both in main and the other
         for other in range(1, len(all_poly)):
             other_ip = point_ind[other]
+            if other_ip.size < 2:
+                continue
 
-            common = np.isin(other_ip, main_ind)
-            if common.sum() < 2:
+            common = other_ip[in_main[other_ip]]
+            if common.size < 2:
                 # This is at most a point contact, no need to do anything
                 continue
             # There is a real intersection between the segments. Add it.
-            boundary_segments.append(other_ip[common])
+            boundary_segments[:, num_boundary_segments] = common
+            num_boundary_segments += 1
 
-        boundary_segments = np.array([i for i in boundary_segments]).T
+        boundary_segments = boundary_segments[:, :num_boundary_segments]
 
         # For segments with at least one interior point, we need to jointly consider
         # intersection points and the original vertexes
         num_coord = coord.shape[1]
         coord_extended = np.hstack((coord, poly))
 
-        # Convenience arrays for navigating between vertexes in the polygon
-        num_vert = poly.shape[1]
-        ind = np.arange(num_vert)
-        next_ind = 1 + ind
-        next_ind[-1] = 0
-        prev_ind = np.arange(num_vert) - 1
-        prev_ind[0] = num_vert - 1
-
-        # Case 2): Find segments that are defined by two interior points
-        points_inside_polyhedron = pp.geometry_property_checks.point_in_polyhedron(
-            polyhedron, poly
-        )
-        # segment_inside[0] tells whehter the point[:, -1] - point[:, 0] is fully inside
-        # the remaining elements are point[:, 0] - point[:, 1] etc.
-        segments_inside = np.logical_and(
-            points_inside_polyhedron, points_inside_polyhedron[next_ind]
-        )
-        # Temporary list of interior segments, it will be adjusted below
-        interior_segments = np.vstack((ind[segments_inside], next_ind[segments_inside]))
-
-        # From here on, we will lean heavily on information on segments that cross the
-        # boundary.
-
-        # The test for interior points does not check if the segment crosses the
-        # domain boundary due to a convex domain; these must be removed.
-        # What we really want is multiple small segments, excluding those that are on
-        # the outside of the domain. These are identified below, under case 3.
-
-        # First, count the number of times a segment of the polygon is associated with
-        # an intersection point
-        count_boundary_segment = np.zeros(num_vert, dtype=np.int)
-        for isect in seg_vert:
-            # Only consider segment intersections, not interior (len==0), and vertexes
-            if len(isect) > 0 and isect[1]:
-                count_boundary_segment[isect[0]] += 1
-
-        # Find presumed interior segments that crosses the boundary
-        segment_crosses_boundary = np.where(
-            np.logical_and(count_boundary_segment > 0, segments_inside)
-        )[0]
-        # Sanity check: If both points are interior, there must be an even number of
-        # segment crossings
-        assert np.all(count_boundary_segment[segment_crosses_boundary] % 2 == 0)
-        # The index of the segments are associated with the first row of the interior_segments
-        # Find the columns to keep by using invert argument to isin
-        keep_ind = np.isin(interior_segments[0], segment_crosses_boundary, invert=True)
-        # Delete false interior segments.
-        interior_segments = interior_segments[:, keep_ind]
-
-        # Adjust index so that it refers to the extended coordinate array
-        interior_segments += num_coord
-
-        # Case 3: Where a segment of the original polygon crosses (including start and
-        # end point) the polyhedron an unknown number of times. This gives rise to
-        # at least one segment, but can be multiple.
-
-        # Storage of identified segments in the constrained polygon
-        segments_interior_boundary = []
-
-        # Check if individual vertexs are on the boundary
-        vertex_on_boundary = np.zeros(num_vert, np.bool)
-        for isect in seg_vert:
-            if len(isect) > 0 and not isect[1]:
-                vertex_on_boundary[isect[0]] = 1
-
-        # Storage of the intersections associated with each segment of the original polygon
-        isects_of_segment = np.zeros(num_vert, np.object)
-        for i in range(num_vert):
-            isects_of_segment[i] = []
-
-        # Identify intersections of each segment.
-        # This is a bit involved, possibly because of a poor choice of data formats:
-        # The actual identification of the sub-segments (next for-loop) uses the
-        # identified intersection points, with an empty point list signifying that there
-        # are no intersections (that is, no sub-segments from this original segment).
-        # The only problem is the case where the original segment runs from a vertex
-        # on the polyhedron boundary to an interior point: This segment must be processed
-        # despite there being no intersections. We achieve that by adding an empty
-        # list to the relevant data field, and then remove the list if a true
-        # intersection is found later
+        # Represent the segment-vertex information as arrays: For each intersection
+        # point, the index of the segment or vertex of the polygon it is associated
+        # with (-1 signifies an interior intersection), and whether this is a segment.
+        isect_vertex = np.full(num_coord, -1, dtype=np.int64)
+        isect_on_segment = np.zeros(num_coord, dtype=np.bool_)
         for isect_ind, isect in enumerate(seg_vert):
             if len(isect) > 0:
-                if isect[1]:
-                    # intersection point lies ona segment
-                    if len(isects_of_segment[isect[0]]) == 0:
-                        isects_of_segment[isect[0]] = [isect_ind]
-                    else:
-                        # Remove empty list if necessary, then add the information
-                        if isinstance(isects_of_segment[isect[0]][0], list):
-                            isects_of_segment[isect[0]] = [isect_ind]
-                        else:
-                            isects_of_segment[isect[0]].append(isect_ind)
-                else:
-                    # intersection point is on a segment
-                    # This segment can be connected to both the previous and next point
-                    if len(isects_of_segment[isect[0]]) == 0:
-                        isects_of_segment[isect[0]].append([])
-                    if len(isects_of_segment[prev_ind[isect[0]]]) == 0:
-                        isects_of_segment[prev_ind[isect[0]]].append([])
-
-        # For all original segments that have intersection points (or vertex) on a
-        # polyhedron boundary, find all points along the segment (original endpoints
-        # and intersection points. Find out which of these sub-segments are inside and
-        # outside the polyhedron, remove exterior parts
-        for seg_ind in range(num_vert):
-            if len(isects_of_segment[seg_ind]) == 0:
-                continue
-            # Index and coordinate of intersection points on this segment
-            loc_isect_ind = np.asarray(isects_of_segment[seg_ind], dtype=np.int).ravel()
-
-            # Consider unique intersection points; there may be repititions in cases
-            # where the polyhedron has multiple parallel sides.
-            isect_coord, _, _ = pp.utils.setmembership.unique_columns_tol(
-                coord[:, loc_isect_ind], tol
-            )
-
-            # Start and end of the full segment
-            start = poly[:, seg_ind].reshape((-1, 1))
-            end = poly[:, next_ind[seg_ind]].reshape((-1, 1))
+                isect_vertex[isect_ind] = isect[0]
+                isect_on_segment[isect_ind] = isect[1]
+
+        # Sanity check: Intersection points on a segment should lie on the line
+        # through its endpoints. All segments are checked in one go, scaled with
+        # the segment length, but not if this is smaller than unity.
+        seg_of_isect = isect_vertex[isect_on_segment]
+        start = poly[:, seg_of_isect]
+        along = poly[:, (seg_of_isect + 1) % poly.shape[1]] - start
+        cross = np.cross(coord[:, isect_on_segment] - start, along, axis=0)
+        assert np.all(
+            np.linalg.norm(cross, axis=0)
+            <= 1e-5 * np.maximum(1, np.linalg.norm(along, axis=0))
+        )
 
-            # Sanity check
-            assert pp.geometry_property_checks.points_are_collinear(
-                np.hstack((start, isect_coord, end))
-            )
-            # Sort the intersection points according to their distance from the start
-            sorted_ind = np.argsort(np.sum((isect_coord - start) ** 2, axis=0))
-
-            # Indices (in terms of columns in coords_extended) along the segment
-            index_along_segment = np.hstack(
-                (
-                    num_coord + seg_ind,
-                    loc_isect_ind[sorted_ind],
-                    num_coord + next_ind[seg_ind],
-                )
-            )
-            # Since the sub-segments are formed by intersection points, every second
-            # will be in the interior of the polyhedron. The first one is interior if
-            # the start point is in the interior or on the boundary of the polyhedron.
-            if points_inside_polyhedron[seg_ind] or vertex_on_boundary[seg_ind]:
-                start_pairs = 0
-            else:
-                start_pairs = 1
-            # Define the vertex pairs of the sub-segmetns, and add the relevant ones.
-            pairs = np.vstack((index_along_segment[:-1], index_along_segment[1:]))
-            for pair_ind in range(start_pairs, pairs.shape[1], 2):
-                segments_interior_boundary.append(pairs[:, pair_ind])
-
-        # Clean up boundary-interior segments
-        if len(segments_interior_boundary) > 0:
-            segments_interior_boundary = np.array(
-                [i for i in segments_interior_boundary]
-            ).T
-        else:
-            segments_interior_boundary = np.zeros((2, 0), dtype=np.int)
+        # Case 2) and 3): Identify the segments with at least one vertex in the
+        # interior of the polyhedron, and collect them together with the boundary
+        # segments. At this stage, we have identified all segments, possibly with
+        # duplicates.
+        segments = _segments_inside_polyhedron(
+            boundary_segments,
+            poly.astype(np.float64),
+            coord,
+            isect_vertex,
+            isect_on_segment,
+            points_inside_polyhedron,
+            tol,
+        )
 
-        # At this stage, we have identified all segments, possibly with duplicates.
         # Next task is to arrive at a unique representation of the segments.
-        # To that end, first collect the segments in a single list
-        segments = np.sort(
-            np.hstack(
-                (boundary_segments, interior_segments, segments_interior_boundary)
-            ),
-            axis=0,
-        )
         # Uniquify intersection coordinates, and update the segments
         unique_coords, _, ib = pp.utils.setmembership.unique_columns_tol(
             coord_extended, tol=tol
         )
-        unique_segments = ib[segments]
-        # Then uniquify the segments, in terms of the unique coordinates
-        unique_segments, *rest = pp.utils.setmembership.unique_columns_tol(
-            unique_segments
-        )
+        # Then uniquify the segments, in terms of the unique coordinates. Sort the
+        # vertexes of each segment, so that segments that only differ in their
+        # direction are identified. The indices are integers, thus exact comparison
+        # suffices.
+        unique_segments = np.unique(np.sort(ib[segments], axis=0), axis=1)
         # Remove point segments.
         point_segment = unique_segments[0] == unique_segments[1]
         unique_segments = unique_segments[:, np.logical_not(point_segment)]
@@ -367,20 +387,24 @@ def polygons_by_polyhedron(polygons, polyhedron, tol=1e-8):
         # If not, there will be multiple connected components. Find these, and
         # make a separate polygon for each.
 
-        # Represent the segments as a graph.
-        graph = nx.Graph()
-        for i in range(unique_segments.shape[1]):
-            graph.add_edge(unique_segments[0, i], unique_segments[1, i])
+        # Represent the segments as a graph, and find its connected components.
+        num_unique_coords = unique_coords.shape[1]
+        graph = sps.coo_matrix(
+            (
+                np.ones(unique_segments.shape[1], dtype=np.bool_),
+                (unique_segments[0], unique_segments[1]),
+            ),
+            shape=(num_unique_coords, num_unique_coords),
+        )
+        _, labels = sps.csgraph.connected_components(graph, directed=False)
+        # Component of each segment. Points not part of any segment form components
+        # of their own; these are not visited below.
+        segment_component = labels[unique_segments[0]]
 
         # Loop over connected components
-        for component in nx.connected_components(graph):
-            # Extract subgraph of this cluster
-            sg = graph.subgraph(component)
-            # Make a list of edges of this subgraph
-            el = []
-            for e in sg.edges():
-                el.append(e)
-            el = np.array([e for e in el]).T
+        for component in np.unique(segment_component):
+            # Edges of this component
+            el = unique_segments[:, segment_component == component]
 
             # The vertexes of the polygon must be ordered. This is done slightly
             # differently depending on whether the polygon forms a closed circle
@@ -443,6 +467,141 @@ def polygons_by_polyhedron(polygons, polyhedron, tol=1e-8):
     return constrained_polygons, np.array(orig_poly_ind)
 
 
+@numba.njit(cache=True)
+def _segments_inside_polyhedron(
+    boundary_segments, poly, coord, isect_vertex, isect_on_segment, vertex_inside, tol
+):
+    """Find the parts of the polygon segments that are inside a polyhedron.
+
+    Helper function for polygons_by_polyhedron.
+
+    Segments with both vertexes in the interior of the polyhedron are kept as they
+    are, unless they cross the polyhedron boundary (possible for non-convex
+    polyhedra). For all original segments that have intersection points (or vertex)
+    on a polyhedron boundary, find all points along the segment (original endpoints
+    and intersection points). Since the sub-segments are formed by intersection
+    points, every second of them will be in the interior of the polyhedron.
+
+    Parameters:
+        boundary_segments (np.ndarray of int, 2 x num_boundary_segments): Segments
+            that lie on the polyhedron boundary, in terms of columns in coord. These
+            are placed first in the returned array.
+        poly (np.ndarray, 3 x num_vert): Vertexes of the polygon.
+        coord (np.ndarray, 3 x num_isect): Intersection points between the polygon
+            and the polyhedron boundary.
+        isect_vertex (np.ndarray of int, num_isect): Index of the polygon segment or
+            vertex associated with each intersection point, -1 if none.
+        isect_on_segment (np.ndarray of bool, num_isect): True if the intersection
+            point lies on a segment, False if it coincides with a vertex.
+        vertex_inside (np.ndarray of bool, num_vert): True for vertexes in the interior
+            of the polyhedron.
+        tol (double): Tolerance used to identify coinciding intersection points.
+
+    Returns:
+        np.ndarray of int, 2 x num_segments: The boundary segments, followed by the
+            interior (sub-)segments. Indices below num_isect refer to columns in
+            coord, indices num_isect + i refer to vertex i of the polygon.
+
+    """
+    num_vert = poly.shape[1]
+    num_isect = coord.shape[1]
+
+    # Count the number of intersections on each segment, and check if individual
+    # vertexes are on the boundary.
+    num_isect_of_segment = np.zeros(num_vert, dtype=np.int64)
+    vertex_on_boundary = np.zeros(num_vert, dtype=np.bool_)
+    for k in range(num_isect):
+        vi = isect_vertex[k]
+        if vi < 0:
+            continue
+        if isect_on_segment[k]:
+            num_isect_of_segment[vi] += 1
+        else:
+            vertex_on_boundary[vi] = True
+
+    # Intersections of each segment, stored in a compressed format
+    offsets = np.zeros(num_vert + 1, dtype=np.int64)
+    for si in range(num_vert):
+        offsets[si + 1] = offsets[si] + num_isect_of_segment[si]
+    isects_of_segment = np.empty(offsets[-1], dtype=np.int64)
+    position = offsets[:-1].copy()
+    for k in range(num_isect):
+        vi = isect_vertex[k]
+        if vi >= 0 and isect_on_segment[k]:
+            isects_of_segment[position[vi]] = k
+            position[vi] += 1
+
+    # Storage for all segments. Each polygon segment gives at most one more
+    # sub-segment than its number of intersections.
+    num_boundary_segments = boundary_segments.shape[1]
+    segments = np.empty(
+        (2, num_boundary_segments + offsets[-1] + num_vert), dtype=np.int64
+    )
+    segments[:, :num_boundary_segments] = boundary_segments
+    num_segments = num_boundary_segments
+
+    for si in range(num_vert):
+        next_si = (si + 1) % num_vert
+
+        if vertex_inside[si] and vertex_inside[next_si]:
+            # Sanity check: If both points are interior, there must be an even
+            # number of segment crossings
+            assert num_isect_of_segment[si] % 2 == 0
+
+        # Segments without intersection points must still be processed if they run
+        # from a vertex on the polyhedron boundary.
+        if num_isect_of_segment[si] == 0 and not (
+            vertex_on_boundary[si] or vertex_on_boundary[next_si]
+        ):
+            if vertex_inside[si] and vertex_inside[next_si]:
+                # This is an original segment of the polygon, fully inside.
+                segments[0, num_segments] = num_isect + si
+                segments[1, num_segments] = num_isect + next_si
+                num_segments += 1
+            continue
+
+        # Sort the intersection points according to their distance from the start
+        loc_isect = isects_of_segment[offsets[si] : offsets[si + 1]]
+        dist = np.zeros(loc_isect.size)
+        for j in range(loc_isect.size):
+            for d in range(3):
+                dist[j] += (coord[d, loc_isect[j]] - poly[d, si]) ** 2
+        sorted_ind = np.argsort(dist)
+
+        # Indices (in terms of columns in coords extended with the polygon vertexes)
+        # along the segment. Consider unique intersection points; there may be
+        # repititions in cases where the polyhedron has multiple parallel sides.
+        index_along_segment = np.empty(loc_isect.size + 2, dtype=np.int64)
+        index_along_segment[0] = num_isect + si
+        num_along = 1
+        for j in sorted_ind:
+            k = loc_isect[j]
+            if num_along > 1:
+                prev = index_along_segment[num_along - 1]
+                d2 = 0.0
+                for d in range(3):
+                    d2 += (coord[d, k] - coord[d, prev]) ** 2
+                if d2 < tol ** 2:
+                    continue
+            index_along_segment[num_along] = k
+            num_along += 1
+        index_along_segment[num_along] = num_isect + next_si
+        num_along += 1
+
+        # The first sub-segment is interior if the start point is in the interior or
+        # on the boundary of the polyhedron.
+        if vertex_inside[si] or vertex_on_boundary[si]:
+            start_pairs = 0
+        else:
+            start_pairs = 1
+        for pair_ind in range(start_pairs, num_along - 1, 2):
+            segments[0, num_segments] = index_along_segment[pair_ind]
+            segments[1, num_segments] = index_along_segment[pair_ind + 1]
+            num_segments += 1
+
+    return segments[:, :num_segments]
+
+
 def snap_points_to_segments(p_edges, edges, tol, p_to_snap=None):
     """
     Snap points in the proximity of lines to the lines.
@@ -475,6 +634,22 @@ def snap_points_to_segments(p_edges, edges, tol, p_to_snap=None):
 
     pn = p_to_snap.copy()
 
+    # Search tree for the points to be snapped, in their original positions. Points
+    # that have been moved by the snapping are tracked separately, both as a mask and
+    # as a list of indices.
+    tree = scipy.spatial.cKDTree(pn.T)
+    moved = np.zeros(pn.shape[1], dtype=np.bool_)
+    moved_ind = []
+
+    # Points closer than tol to a segment are within half the segment length plus tol
+    # of its midpoint. Find the candidates for all segments in a single query, based
+    # on the original segment coordinates.
+    start = p_edges[:, edges[0]]
+    end = p_edges[:, edges[1]]
+    center = 0.5 * (start + end)
+    radius = 0.5 * np.sqrt(np.sum((end - start) ** 2, axis=0)) + tol
+    all_candidates = tree.query_ball_point(center.T, radius)
+
     nl = edges.shape[1]
     for ei in range(nl):
 
@@ -488,10 +663,27 @@ def snap_points_to_segments(p_edges, edges, tol, p_to_snap=None):
         else:
             p_start = p_edges[:, edges[0, ei]].reshape((-1, 1))
             p_end = p_edges[:, edges[1, ei]].reshape((-1, 1))
-        d_segment, cp = pp.distances.points_segments(pn, p_start, p_end)
-        hit = np.argwhere(d_segment[:, 0] < tol)
-        for i in hit:
+
+        if mod_edges and (moved[edges[0, ei]] or moved[edges[1, ei]]):
+            # The segment itself has been moved, find new candidates
+            candidates = tree.query_ball_point(
+                0.5 * (p_start + p_end).ravel(),
+                0.5 * np.linalg.norm(p_end - p_start) + tol,
+            )
+        else:
+            candidates = all_candidates[ei]
+        candidates = np.union1d(candidates, moved_ind).astype(np.intp)
+        if candidates.size == 0:
+            continue
+
+        d_segment, cp = pp.distances.points_segments(pn[:, candidates], p_start, p_end)
+        hit = np.flatnonzero(d_segment[:, 0] < tol)
+        for ci in hit:
+            i = candidates[ci]
             if mod_edges and (i == edges[0, ei] or i == edges[1, ei]):
                 continue
-            pn[:, i] = cp[i, 0, :].reshape((-1, 1))
+            pn[:, i] = cp[ci, 0, :]
+            if not moved[i]:
+                moved[i] = True
+                moved_ind.append(i)
     return pn
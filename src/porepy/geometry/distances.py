@@ -484,6 +484,9 @@ def segments_polygon(start, end, poly, tol=1e-5):
     assert np.all(np.abs(poly_rot[2]) < tol)
 
     poly_xy = poly_rot[:2]
+    # The polygon is used in several inside tests below, fix its orientation once.
+    if not pp.geometry_property_checks.is_ccw_polygon(poly_xy):
+        poly_xy = poly_xy[:, ::-1]
 
     # Rotate the point set, using the same coordinate system.
     start = rot_p.dot(start)
@@ -504,7 +507,9 @@ def segments_polygon(start, end, poly, tol=1e-5):
 
     x0 = start + (end - start) * t
     # Check if zero point is inside the polygon
-    inside = pp.geometry_property_checks.point_in_polygon(poly_xy, x0[:2])
+    inside = pp.geometry_property_checks.point_in_polygon(
+        poly_xy, x0[:2], assume_ccw=True
+    )
     crosses = np.logical_and(inside, zero_along_segment)
 
     # For points with zero incline, the z-coordinate should be zero for the
@@ -516,8 +521,10 @@ def segments_polygon(start, end, poly, tol=1e-5):
     # option of the segment crossing the polygon within the plane, but this
     # will be handled by the crossing of segments below
     endpoint_in_polygon = np.logical_or(
-        pp.geometry_property_checks.point_in_polygon(poly_xy, start[:2]),
-        pp.geometry_property_checks.point_in_polygon(poly_xy, end[:2]),
+        pp.geometry_property_checks.point_in_polygon(
+            poly_xy, start[:2], assume_ccw=True
+        ),
+        pp.geometry_property_checks.point_in_polygon(poly_xy, end[:2], assume_ccw=True),
     )
 
     segment_in_polygon = np.logical_and(segment_in_plane, endpoint_in_polygon)
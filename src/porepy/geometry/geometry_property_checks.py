@@ -4,8 +4,10 @@
 Functions for (boolean) inquires about geometric objects, and relations between
 objects.
 """
+import numba
 import numpy as np
 import scipy
+import scipy.spatial
 
 import porepy as pp
 
@@ -45,13 +47,10 @@ def is_ccw_polygon(poly: np.ndarray) -> bool:
         False
 
     """
-    p_0 = np.append(poly[0], poly[0, 0])
-    p_1 = np.append(poly[1], poly[1, 0])
-
-    num_p = poly.shape[1]
-    value = 0
-    for i in range(num_p):
-        value += (p_1[i + 1] + p_1[i]) * (p_0[i + 1] - p_0[i])
+    x = poly[0]
+    y = poly[1]
+    # Shoelace formula, summed over the segments (i, i+1), with wrap-around
+    value = np.dot(np.roll(y, -1) + y, np.roll(x, -1) - x)
     return value < 0
 
 
@@ -91,10 +90,23 @@ def is_ccw_polyline(p1, p2, p3, tol=0, default=False):
         is_ccw_polygon
 
     """
-    if p3.size > 2:
-        num_points = p3.shape[1]
-    else:
-        num_points = 1
+    if p3.size <= 2:
+        # Single point, use the compiled version of the test
+        p1 = np.ravel(p1)
+        p2 = np.ravel(p2)
+        p3 = np.ravel(p3)
+        return _is_ccw_polyline_kernel(
+            float(p1[0]),
+            float(p1[1]),
+            float(p2[0]),
+            float(p2[1]),
+            float(p3[0]),
+            float(p3[1]),
+            tol,
+            default,
+        )
+
+    num_points = p3.shape[1]
 
     # Compute cross product between p1-p2 and p1-p3. Right hand rule gives that
     # p3 is to the left if the cross product is positive.
@@ -116,10 +128,25 @@ def is_ccw_polyline(p1, p2, p3, tol=0, default=False):
         return is_ccw
 
 
+@numba.njit(cache=True)
+def _is_ccw_polyline_kernel(p1x, p1y, p2x, p2y, p3x, p3y, tol, default):
+    """Single point version of is_ccw_polyline, see that function for documentation."""
+    cross_product = (p2x - p1x) * (p3y - p1y) - (p2y - p1y) * (p3x - p1x)
+    if cross_product > tol:
+        return True
+    elif cross_product < -tol:
+        return False
+    elif abs(cross_product) <= tol:
+        return default
+    else:
+        # This can only happen for nan values
+        return True
+
+
 # -----------------------------------------------------------------------------
 
 
-def point_in_polygon(poly, p, tol=0, default=False):
+def point_in_polygon(poly, p, tol=0, default=False, assume_ccw=False):
     """
     Check if a set of points are inside a polygon.
 
@@ -133,6 +160,9 @@ def point_in_polygon(poly, p, tol=0, default=False):
             zero.
         default (boolean, optional): Default behavior if the point is close to
             the boundary of the polygon. Defaults to False.
+        assume_ccw (boolean, optional): If True, the vertexes of the polygon are
+            known to be sorted in a ccw fashion, and the check of the orientation is
+            skipped. Defaults to False.
 
     Returns:
         np.ndarray, boolean: Length equal to p, true if the point is inside the
@@ -146,41 +176,41 @@ def point_in_polygon(poly, p, tol=0, default=False):
 
     # The test uses is_ccw_polyline, and tacitly assumes that the polygon
     # vertexes is sorted in a ccw fashion. If this is not the case, flip the
-    # order of the nodes on a copy, and use this for the testing.
+    # order of the nodes, and use this for the testing.
     # Note that if the nodes are not cw nor ccw (e.g. they are crossing), the
     # test cannot be trusted anyhow.
-    if not is_ccw_polygon(poly):
-        poly = poly.copy()[:, ::-1]
+    if not assume_ccw and not is_ccw_polygon(poly):
+        poly = poly[:, ::-1]
 
-    poly_size = poly.shape[1]
+    # Start and end points of all polygon segments
+    start = poly[:2]
+    end = np.roll(poly[:2], -1, axis=1)
 
-    inside = np.ones(pt.shape[1], dtype=np.bool)
-    for j in range(poly.shape[1]):
-        this_ccw = is_ccw_polyline(
-            poly[:, j], poly[:, (j + 1) % poly_size], pt, tol=tol, default=default
-        )
-        inside[np.logical_not(this_ccw)] = False
+    # Cross products between all segments and the vectors from the segment start
+    # to the test points, computed as in is_ccw_polyline. Rows correspond to
+    # segments, columns to points.
+    cross_product = (end[0] - start[0]).reshape((-1, 1)) * (
+        pt[1] - start[1].reshape((-1, 1))
+    ) - (end[1] - start[1]).reshape((-1, 1)) * (pt[0] - start[0].reshape((-1, 1)))
 
-    return inside
+    is_ccw = np.where(np.abs(cross_product) <= tol, default, cross_product > tol)
+
+    # A point is inside if it is on the ccw side of all segments.
+    return np.all(is_ccw, axis=0)
 
 
 def point_in_polyhedron(polyhedron, test_points, tol=1e-8):
     """Test whether a set of point is inside a polyhedron.
 
-    The actual algorithm and implementation used for the test can be found
-    at
-
-        https://github.com/mdickinson/polyhedron/blob/master/polyhedron.py
+    The test computes the winding number of the polyhedron surface around each
+    point, as the sum of the signed solid angles of the triangles in a
+    triangulation of the surface, see
 
-    By Mark Dickinson. From what we know, the implementation is only available
-    on github (no pypi or similar), and we are also not aware of other
-    implementations of algorithms for point-in-polyhedron problems that allows
-    for non-convex polyhedra. Moreover, the file above has an unclear licence.
-    Therefore, to use the present function, download the above file and put it
-    in the PYTHONPATH with the name 'robust_point_in_polyhedron.py'
-    (polyhedron.py seemed too general a name for this).
+        https://en.wikipedia.org/wiki/Solid_angle#Tetrahedron
 
-    Suggestions for better solutions to this are most welcome.
+    The winding number is non-zero for points inside the polyhedron, also if the
+    polyhedron is non-convex. Points on the boundary of the polyhedron are
+    considered outside.
 
     Parameters:
         polyhedron (list of np.ndarray): Each list element represent a side
@@ -194,82 +224,155 @@ def point_in_polyhedron(polyhedron, test_points, tol=1e-8):
             inside the polygon.
 
     """
-    # If you get an error message here, read documentation of the method.
-    try:
-        import robust_point_in_polyhedron
-    except ImportError:
-        raise ImportError(
-            """Cannot import robust_points_inside_polyhedron.
-                          Read documentation of
-                          pp.geometry.geometry_property_checks.point_in_polyhedron for
-                          install instructions.
-                          """
-        )
-
     # The actual test requires that the polyhedra surface is described by
     # a triangulation. To that end, loop over all polygons and compute
     # triangulation. This is again done by a projection to 2d
 
-    # Data storage
-    tri = np.zeros((0, 3))
-    points = np.zeros((3, 0))
+    # Data storage. All vertexes of the polygons are used in the triangulation,
+    # thus the point array can be allocated up front.
+    poly_size = np.array([poly.shape[1] for poly in polyhedron])
+    poly_start = np.hstack((0, np.cumsum(poly_size)))
+    points = np.empty((3, poly_start[-1]))
+    tri_list = []
 
-    num_points = 0
-    for poly in polyhedron:
+    for pi, poly in enumerate(polyhedron):
         # Shortcut if the polygon already is a triangle
         if poly.shape[1] == 3:
-            simplices = np.array([0, 1, 2])
+            simplices = np.array([[0, 1, 2]])
         else:
-            R = pp.map_geometry.project_plane_matrix(poly)
-            # Project to 2d, Delaunay
+            # The sides of the polyhedron are assumed planar, skip the check
+            R = pp.map_geometry.project_plane_matrix(poly, check_planar=False)
+            # Project to 2d, Delaunay. The polygons are convex, thus the handling of
+            # wide facets (Q12) in the scipy default options is not needed.
             p_2d = R.dot(poly)[:2]
-            loc_tri = scipy.spatial.Delaunay(p_2d.T)
+            loc_tri = scipy.spatial.Delaunay(p_2d.T, qhull_options="Qbb Qc Qz")
             simplices = loc_tri.simplices
 
         # Add the triangulation, with indices adjusted for the number of points
         # already added
-        tri = np.vstack((tri, num_points + simplices))
-        points = np.hstack((points, poly))
-        num_points += simplices.max() + 1
+        tri_list.append(poly_start[pi] + simplices)
+        points[:, poly_start[pi] : poly_start[pi + 1]] = poly
+
+    tri = np.concatenate(tri_list, axis=0)
 
     # Uniquify points, and update triangulation
     upoints, _, ib = pp.utils.setmembership.unique_columns_tol(points, tol=tol)
-    ut = ib[tri.astype(np.int)]
+    ut = ib[tri]
 
-    # The in-polyhedra algorithm requires a very particular ordering of the vertexes
-    # in the triangulation. Fix this.
+    # The sign of the solid angles depends on the ordering of the vertexes in the
+    # triangles, which therefore must be consistent over the surface. Fix this.
     # Note: We cannot do a standard CCW sorting here, since the polygons lie in
     # different planes, and projections to 2d may or may not rotate the polygon.
     sorted_t = pp.utils.sort_points.sort_triangle_edges(ut.T).T
 
-    # Generate tester for points
-    test_object = robust_point_in_polyhedron.Polyhedron(sorted_t, upoints.T)
-
     if test_points.size < 4:
         test_points = test_points.reshape((-1, 1))
 
-    is_inside = np.zeros(test_points.shape[1], dtype=np.bool)
-
-    # Loop over all points, check if they are inside.
-    for pi in range(test_points.shape[1]):
-        # NOTE: The documentation of the test is a bit unclear, but it seems
-        # a winding number of 0 means outside, non-zero is inside
-        try:
-            is_inside[pi] = np.abs(test_object.winding_number(test_points[:, pi])) > 0
-            # If the given point is on the boundary, this will produce an error informing
-            # about coplanar or collinear points. Interpret this as a False (not inside)
-        except ValueError as err:
-            if str(err) in [
-                "vertices coplanar with origin",
-                "vertices collinear with origin",
-                "vertex coincides with origin",
-            ]:
-                is_inside[pi] = False
-            else:
-                # If the error is about something else, raise it again.
-                raise err
+    winding_number, on_boundary = _winding_numbers(
+        np.ascontiguousarray(sorted_t, dtype=np.int64),
+        np.asarray(upoints, dtype=np.float64),
+        np.asarray(test_points, dtype=np.float64),
+        tol,
+    )
+    # A winding number of 0 means outside, non-zero is inside. Points on the
+    # boundary are interpreted as not inside.
+    return np.logical_and(winding_number != 0, np.logical_not(on_boundary))
 
-    return is_inside
+
+@numba.njit(cache=True, parallel=True)
+def _winding_numbers(triangles, vertices, test_points, tol):
+    """Compute the winding number of a triangulated surface around a set of points.
+
+    Parameters:
+        triangles (np.ndarray, num_tri x 3): Vertex indexes of the triangles, with a
+            consistent ordering of the vertexes over the surface.
+        vertices (np.ndarray, 3 x num_vertexes): Coordinates of the vertexes.
+        test_points (np.ndarray, 3 x num_pt): Points to be tested.
+        tol (double): Geometric tolerance, used to identify points on the surface.
+
+    Returns:
+        np.ndarray of int, size num_pt: Winding number around each of the points.
+        np.ndarray of boolean, size num_pt: True if the point lies on the surface.
+
+    """
+    num_pts = test_points.shape[1]
+    num_tri = triangles.shape[0]
+
+    winding_number = np.zeros(num_pts, dtype=np.int64)
+    on_boundary = np.zeros(num_pts, dtype=np.bool_)
+
+    for pi in numba.prange(num_pts):
+        px = test_points[0, pi]
+        py = test_points[1, pi]
+        pz = test_points[2, pi]
+
+        solid_angle = 0.0
+        for ti in range(num_tri):
+            ia = triangles[ti, 0]
+            ib = triangles[ti, 1]
+            ic = triangles[ti, 2]
+            # Triangle vertexes relative to the test point
+            ax = vertices[0, ia] - px
+            ay = vertices[1, ia] - py
+            az = vertices[2, ia] - pz
+            bx = vertices[0, ib] - px
+            by = vertices[1, ib] - py
+            bz = vertices[2, ib] - pz
+            cx = vertices[0, ic] - px
+            cy = vertices[1, ic] - py
+            cz = vertices[2, ic] - pz
+
+            la = np.sqrt(ax * ax + ay * ay + az * az)
+            lb = np.sqrt(bx * bx + by * by + bz * bz)
+            lc = np.sqrt(cx * cx + cy * cy + cz * cz)
+
+            # Triple product a . (b x c)
+            det = (
+                ax * (by * cz - bz * cy)
+                + ay * (bz * cx - bx * cz)
+                + az * (bx * cy - by * cx)
+            )
+
+            # Normal vector of the triangle, (b - a) x (c - a)
+            nx = (by - ay) * (cz - az) - (bz - az) * (cy - ay)
+            ny = (bz - az) * (cx - ax) - (bx - ax) * (cz - az)
+            nz = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+            nrm2 = nx * nx + ny * ny + nz * nz
+
+            # The distance from the point to the plane of the triangle is
+            # |det| / |n|. If the point is in the plane, check whether it is also
+            # inside the triangle by the barycentric coordinates, which are
+            # computed from the normals of the sub-triangles formed with the point.
+            if det * det <= tol * tol * nrm2:
+                wa = (
+                    nx * (by * cz - bz * cy)
+                    + ny * (bz * cx - bx * cz)
+                    + nz * (bx * cy - by * cx)
+                ) / nrm2
+                wb = (
+                    nx * (cy * az - cz * ay)
+                    + ny * (cz * ax - cx * az)
+                    + nz * (cx * ay - cy * ax)
+                ) / nrm2
+                wc = 1.0 - wa - wb
+                if wa >= -tol and wb >= -tol and wc >= -tol:
+                    on_boundary[pi] = True
+                    break
+
+            # Signed solid angle of the triangle seen from the point, by the formula
+            # of Van Oosterom and Strackee.
+            denominator = (
+                la * lb * lc
+                + (ax * bx + ay * by + az * bz) * lc
+                + (ax * cx + ay * cy + az * cz) * lb
+                + (bx * cx + by * cy + bz * cz) * la
+            )
+            solid_angle += 2.0 * np.arctan2(det, denominator)
+
+        # The solid angles sum to 4 pi times the winding number.
+        winding_number[pi] = int(np.round(solid_angle / (4.0 * np.pi)))
+
+    return winding_number, on_boundary
 
 
 def points_are_planar(pts, normal=None, tol=1e-5):
@@ -290,14 +393,14 @@ def points_are_planar(pts, normal=None, tol=1e-5):
     else:
         normal = normal.flatten() / np.linalg.norm(normal)
 
-    check_all = np.zeros(pts.shape[1] - 1, dtype=np.bool)
+    # Normalized vectors from the first point to all other points. Coinciding
+    # points are left unscaled.
+    diff = pts[:, :1] - pts[:, 1:]
+    den = np.linalg.norm(diff, axis=0)
+    den[den == 0] = 1
+    dotprod = normal.dot(diff / den)
 
-    for idx, p in enumerate(pts[:, 1:].T):
-        den = np.linalg.norm(pts[:, 0] - p)
-        dotprod = np.dot(normal, (pts[:, 0] - p) / (den if den else 1))
-        check_all[idx] = np.isclose(dotprod, 0, atol=tol, rtol=0)
-
-    return np.all(check_all)
+    return np.all(np.abs(dotprod) <= tol)
 
 
 def point_in_cell(poly, p, if_make_planar=True):
@@ -318,25 +421,90 @@ def point_in_cell(poly, p, if_make_planar=True):
         boolean, if the point is inside the cell. If a point is on the boundary
         of the cell the result may be either True or False.
     """
-    p.shape = (3, 1)
+    p = p.reshape((3, 1))
     if if_make_planar:
         R = pp.map_geometry.project_plane_matrix(poly)
         poly = np.dot(R, poly)
         p = np.dot(R, p)
 
-    j = poly.shape[1] - 1
+    poly = np.asarray(poly, dtype=np.float64)
+    return _point_in_cell_kernel(poly[0], poly[1], p[0, 0], p[1, 0])
+
+
+def points_in_cell(poly, p, if_make_planar=True):
+    """
+    Check whatever a set of points are inside a cell. This is the vectorized
+    version of point_in_cell, the projection onto the plane of the cell is
+    computed once for all points.
+
+    Parameters:
+        poly (np.ndarray, 3xn): vertexes of polygon. The segments are formed by
+            connecting subsequent columns of poly.
+        p (np.array, 3 x num_pt): Points to be tested.
+    if_make_planar (optional, default True): The cell needs to lie on (s, t)
+        plane. If not already done, this flag need to be used.
+
+    Return:
+        np.ndarray, boolean, size num_pt: True if the point is inside the cell.
+        If a point is on the boundary of the cell the result may be either True
+        or False.
+
+    See also:
+        point_in_cell
+
+    """
+    p = p.reshape((3, -1))
+    if if_make_planar:
+        R = pp.map_geometry.project_plane_matrix(poly)
+        poly = np.dot(R, poly)
+        p = np.dot(R, p)
+
+    poly = np.asarray(poly, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    return _points_in_cell_kernel(poly[0], poly[1], p[0], p[1])
+
+
+@numba.njit(cache=True, parallel=True)
+def _points_in_cell_kernel(poly_x, poly_y, px, py):
+    """Ray casting test for a set of points in a planar polygon.
+
+    See _point_in_cell_kernel for a description of the algorithm.
+
+    """
+    num_pts = px.size
+    is_inside = np.zeros(num_pts, dtype=np.bool_)
+    for pi in numba.prange(num_pts):
+        is_inside[pi] = _point_in_cell_kernel(poly_x, poly_y, px[pi], py[pi])
+    return is_inside
+
+
+@numba.njit(cache=True)
+def _point_in_cell_kernel(poly_x, poly_y, px, py):
+    """Ray casting test for a single point in a planar polygon.
+
+    The ray is sent in the negative x-direction, the point is inside the polygon
+    if the ray crosses its boundary an odd number of times.
+
+    Parameters:
+        poly_x (np.ndarray, n): x-coordinates of the polygon vertexes.
+        poly_y (np.ndarray, n): y-coordinates of the polygon vertexes.
+        px (float): x-coordinate of the point.
+        py (float): y-coordinate of the point.
+
+    Returns:
+        boolean, True if the point is inside the polygon.
+
+    """
+    num_vertexes = poly_x.size
+    j = num_vertexes - 1
     is_odd = False
 
-    for i in np.arange(poly.shape[1]):
-        if (poly[1, i] < p[1] and poly[1, j] >= p[1]) or (
-            poly[1, j] < p[1] and poly[1, i] >= p[1]
-        ):
+    for i in range(num_vertexes):
+        if (poly_y[i] < py and poly_y[j] >= py) or (poly_y[j] < py and poly_y[i] >= py):
             if (
-                poly[0, i]
-                + (p[1] - poly[1, i])
-                / (poly[1, j] - poly[1, i])
-                * (poly[0, j] - poly[0, i])
-            ) < p[0]:
+                poly_x[i]
+                + (py - poly_y[i]) / (poly_y[j] - poly_y[i]) * (poly_x[j] - poly_x[i])
+            ) < px:
                 is_odd = not is_odd
         j = i
 
@@ -362,15 +530,13 @@ def points_are_collinear(pts, tol=1e-5):
     pt0 = pts[:, 0]
     pt1 = pts[:, 1]
 
-    dist = 1
-    for i in np.arange(pts.shape[1]):
-        for j in np.arange(i + 1, pts.shape[1]):
-            dist = max(dist, np.linalg.norm(pts[:, i] - pts[:, j]))
+    # Scale with the maximum distance between two points, but not if this is
+    # smaller than unity.
+    dist = max(1, scipy.spatial.distance.pdist(pts.T).max())
 
-    coll = (
-        np.array([np.linalg.norm(np.cross(p - pt0, pt1 - pt0)) for p in pts[:, 1:-1].T])
-        / dist
-    )
+    cross = np.cross(pts[:, 1:-1].T - pt0, pt1 - pt0)
+    # For 2d points, the cross product is a scalar for each point
+    coll = np.linalg.norm(cross.reshape((cross.shape[0], -1)), axis=1) / dist
     return np.allclose(coll, np.zeros(coll.size), atol=tol, rtol=0)
 
 
@@ -1488,8 +1488,8 @@ def surface_tessalations(
                 tri_counter += 1
 
             else:
-                # Check if the polygon is convex. Loop over the polygon vertexes, and
-                # check if they form a CW or CCW part of the polygon. If they all
+                # Check if the polygon is convex. Check if each of the polygon
+                # vertexes form a CW or CCW part of the polygon. If they all
                 # have the same configuration, the polygon is convex
 
                 # Three representation of the polygon vertexes, by shifting their order
@@ -1497,13 +1497,8 @@ def surface_tessalations(
                 middle = np.roll(poly, -1, axis=1)  # This is the vertex we test
                 end = np.roll(poly, -2, axis=1)
                 # Use ccw test on all vertexes in the polygon
-                is_ccw = np.array(
-                    [
-                        pp.geometry_property_checks.is_ccw_polyline(
-                            start[:, i], middle[:, i], end[:, i]  # type:ignore
-                        )
-                        for i in range(poly.shape[1])  # type:ignore
-                    ]
+                is_ccw = np.atleast_1d(
+                    pp.geometry_property_checks.is_ccw_polyline(start, middle, end)
                 )
 
                 if np.all(is_ccw) or np.all(np.logical_not(is_ccw)):
@@ -22,7 +22,7 @@ def force_point_collinearity(pts):
     """
     assert pts.shape[1] > 1
 
-    delta = pts - np.tile(pts[:, 0], (pts.shape[1], 1)).T
+    delta = pts - pts[:, 0].reshape((-1, 1))
     dist = np.sqrt(np.einsum("ij,ij->j", delta, delta))
     end = np.argmax(dist)
 
@@ -206,7 +206,7 @@ def project_plane_matrix(pts, normal=None, tol=1e-5, reference=None, check_plana
     if check_planar:
         assert pp.geometry_property_checks.points_are_planar(pts, normal, tol)
 
-    reference = np.asarray(reference, dtype=np.float)
+    reference = np.asarray(reference, dtype=np.float64)
     angle = np.arccos(np.dot(normal, reference))
     vect = np.cross(normal, reference)
     return rotation_matrix(angle, vect)
@@ -236,7 +236,7 @@ def project_line_matrix(pts, tangent=None, tol=1e-5, reference=None):
     if reference is None:
         reference = [0, 0, 1]
 
-    reference = np.asarray(reference, dtype=np.float)
+    reference = np.asarray(reference, dtype=np.float64)
     angle = np.arccos(np.dot(tangent, reference))
     vect = np.cross(tangent, reference)
     return rotation_matrix(angle, vect)
@@ -257,19 +257,22 @@ def rotation_matrix(a, vect):
     identify matrix.
 
     """
-    if np.allclose(vect, [0.0, 0.0, 0.0]):
+    vect = np.asarray(vect, dtype=np.float64).ravel()
+    # Same criterion for a zero vector as np.allclose(vect, 0)
+    if np.abs(vect).max() <= 1e-8:
         return np.identity(3)
-    vect = vect / np.linalg.norm(vect)
-
-    # Prioritize readability over PEP0008 whitespaces.
-    # pylint: disable=bad-whitespace
-    W = np.array(
-        [[0.0, -vect[2], vect[1]], [vect[2], 0.0, -vect[0]], [-vect[1], vect[0], 0.0]]
-    )
-    return (
-        np.identity(3)
-        + np.sin(a) * W
-        + (1.0 - np.cos(a)) * np.linalg.matrix_power(W, 2)
+    x, y, z = vect / np.sqrt(vect.dot(vect))
+
+    # Entries of I + sin(a) W + (1 - cos(a)) W^2, where W is the cross product
+    # matrix of the normalized vector, written out term by term.
+    s = np.sin(a)
+    t = 1.0 - np.cos(a)
+    return np.array(
+        [
+            [1.0 + t * (-z * z - y * y), -s * z + t * (y * x), s * y + t * (z * x)],
+            [s * z + t * (x * y), 1.0 + t * (-z * z - x * x), -s * x + t * (z * y)],
+            [-s * y + t * (x * z), s * x + t * (y * z), 1.0 + t * (-y * y - x * x)],
+        ]
     )
 
 
@@ -296,7 +299,7 @@ def normal_matrix(pts=None, normal=None):
     else:
         assert False, "Points or normal are mandatory"
 
-    return np.tensordot(normal, normal, axes=0)
+    return np.outer(normal, normal)
 
 
 def tangent_matrix(pts=None, normal=None):
@@ -335,12 +338,22 @@ def compute_normal(pts, check=True):
     if pts.shape[1] <= 2:
         raise ValueError("in compute_normal: pts.shape[1] must be larger than 2")
     normal = np.cross(pts[:, 0] - pts[:, 1], pts[:, 2] - pts[:, 1])
-    count = 0
-    max_count = pts.shape[1] - 3
-    while np.allclose(normal, np.zeros(3)) and count <= max_count and check:
-        count += 1
-        normal = np.cross(pts[:, 0] - pts[:, 1], np.mean(pts, axis=1) - pts[:, 2])
-        pts = pts[:, 1:]
+    if check and np.allclose(normal, np.zeros(3)):
+        # The first three points are collinear. Try the cross products between the
+        # vectors pts[:, i] - pts[:, i + 1] and the vectors from pts[:, i + 2] to the
+        # mean of pts[:, i:], and pick the first that is nonzero.
+        num_pts = pts.shape[1]
+        suffix_sum = np.cumsum(pts[:, ::-1], axis=1)[:, ::-1]
+        suffix_mean = suffix_sum[:, : num_pts - 2] / np.arange(num_pts, 2, -1)
+        candidates = np.cross(
+            (pts[:, : num_pts - 2] - pts[:, 1 : num_pts - 1]).T,
+            (suffix_mean - pts[:, 2:]).T,
+        )
+        nonzero = np.any(np.abs(candidates) > 1e-8, axis=1)
+        if np.any(nonzero):
+            normal = candidates[np.argmax(nonzero)]
+        else:
+            normal = candidates[-1]
     if check and np.allclose(normal, np.zeros(3)):
         raise RuntimeError(
             "Unable to calculate normal from point set. Are all points collinear?"
@@ -349,9 +362,20 @@ def compute_normal(pts, check=True):
 
 
 def compute_normals_1d(pts):
+    """Compute two normal vectors of a set of points on a line.
+
+    Parameters:
+    pts: np.ndarray, 3xn, the points. Need n > 1.
+
+    Returns:
+    normals: np.ndarray, 3x2, two orthonormal vectors, both normal to the line.
+
+    """
     t = compute_tangent(pts)
     n = np.array([t[1], -t[0], 0]) / np.sqrt(t[0] ** 2 + t[1] ** 2)
-    return np.r_["1,2,0", n, np.dot(rotation_matrix(np.pi / 2.0, t), n)]
+    # The second normal is the first one rotated by pi/2 around the tangent. Since
+    # the two are orthogonal unit vectors, this is their cross product.
+    return np.vstack((n, np.cross(t, n))).T
 
 
 def compute_tangent(pts, check=True):
@@ -373,7 +397,7 @@ def compute_tangent(pts, check=True):
     # is nonzero
     tangent = pts - mean_pts
     # Find the point that is furthest away from the mean point
-    max_ind = np.argmax(np.sum(tangent ** 2, axis=0))
+    max_ind = np.argmax(np.einsum("ij,ij->j", tangent, tangent))
     tangent = tangent[:, max_ind]
     if check:
         assert not np.allclose(tangent, np.zeros(3))
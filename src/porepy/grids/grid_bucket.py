@@ -417,12 +417,12 @@ class GridBucket:
             KeyError if the two grids do not form an edge.
 
         """
-        if tuple(edge) in list(self._edges.keys()):
+        if tuple(edge) in self._edges:
             if key is None:
                 return self._edges[edge]
             else:
                 return self._edges[edge][key]
-        elif tuple(edge[::-1]) in list(self._edges.keys()):
+        elif tuple(edge[::-1]) in self._edges:
             if key is None:
                 return self._edges[(edge[1], edge[0])]
             else:
@@ -469,9 +469,9 @@ class GridBucket:
             KeyError if the two grids do not form an edge.
 
         """
-        if tuple(edge) in list(self._edges.keys()):
+        if tuple(edge) in self._edges:
             self._edges[(edge[0], edge[1])][key] = val
-        elif tuple(edge[::-1]) in list(self._edges.keys()):
+        elif tuple(edge[::-1]) in self._edges:
             self._edges[(edge[1], edge[0])][key] = val
 
         else:
@@ -617,9 +617,7 @@ class GridBucket:
         if len(grids) != 2:
             raise ValueError("An edge should be specified by exactly two grids")
 
-        if tuple(grids) in list(self._edges.keys()) or tuple(grids[::-1]) in list(
-            self._edges.keys()
-        ):
+        if tuple(grids) in self._edges or tuple(grids[::-1]) in self._edges:
             raise ValueError("Cannot add existing edge")
 
         data = {"face_cells": face_cells}
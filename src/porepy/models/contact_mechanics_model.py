@@ -11,7 +11,7 @@ undergo major changes on little notice.
 """
 import logging
 import time
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
@@ -131,8 +131,8 @@ class ContactMechanics(porepy.models.abstract_model.AbstractModel):
         size = self.assembler.num_dof()
         state = np.zeros(size)
         for g, var in self.assembler.block_dof.keys():
-            # Index of
-            ind = self.assembler.dof_ind(g, var)
+            # Range of the block in the global vector
+            ind = self.assembler.dof_range(g, var)
 
             if isinstance(g, tuple):
                 values = self.gb.edge_props(g)[pp.STATE][var]
@@ -201,18 +201,17 @@ class ContactMechanics(porepy.models.abstract_model.AbstractModel):
             error = np.nan if diverged else 0
             return error, converged, diverged
 
-        mech_dof = self.assembler.dof_ind(g_max, self.displacement_variable)
+        mech_dof = self.assembler.dof_range(g_max, self.displacement_variable)
 
-        # Also find indices for the contact variables
-        contact_dof = np.array([], dtype=np.int)
+        # Also find indices for the contact variables. Collect the indices of all
+        # fractures, and concatenate them once.
+        contact_dof_list: List[np.ndarray] = [np.array([], dtype=int)]
         for e, _ in self.gb.edges():
             if e[0].dim == self._Nd:
-                contact_dof = np.hstack(
-                    (
-                        contact_dof,
-                        self.assembler.dof_ind(e[1], self.contact_traction_variable),
-                    )
+                contact_dof_list.append(
+                    self.assembler.dof_ind(e[1], self.contact_traction_variable)
                 )
+        contact_dof = np.concatenate(contact_dof_list)
 
         # Pick out the solution from current, previous iterates, as well as the
         # initial guess.
@@ -625,39 +624,30 @@ class ContactMechanics(porepy.models.abstract_model.AbstractModel):
 
         """
         assembler = self.assembler
-        variable_names = []
-        for pair in assembler.block_dof.keys():
-            variable_names.append(pair[1])
-
-        dof = np.cumsum(np.append(0, np.asarray(assembler.full_dof)))
-
-        for var_name in set(variable_names):
-            for pair, bi in assembler.block_dof.items():
-                g = pair[0]
-                name = pair[1]
-                if name != var_name:
-                    continue
-                if isinstance(g, tuple):
-                    # This is really an edge
-                    if name == self.mortar_displacement_variable:
-                        mortar_u = solution_vector[dof[bi] : dof[bi + 1]]
-                        data = self.gb.edge_props(g)
+
+        # Each block is visited once; the variable name is checked in the loop body.
+        for g, name in assembler.block_dof:
+            if isinstance(g, tuple):
+                # This is really an edge
+                if name == self.mortar_displacement_variable:
+                    mortar_u = solution_vector[assembler.dof_range(g, name)]
+                    data = self.gb.edge_props(g)
+                    data[pp.STATE][pp.ITERATE][
+                        self.mortar_displacement_variable
+                    ] = mortar_u.copy()
+            else:
+                data = self.gb.node_props(g)
+
+                # g is a node (not edge)
+
+                # For the fractures, update the contact force
+                if g.dim < self._Nd:
+                    if name == self.contact_traction_variable:
+                        contact = solution_vector[assembler.dof_range(g, name)]
+                        data = self.gb.node_props(g)
                         data[pp.STATE][pp.ITERATE][
-                            self.mortar_displacement_variable
-                        ] = mortar_u.copy()
-                else:
-                    data = self.gb.node_props(g)
-
-                    # g is a node (not edge)
-
-                    # For the fractures, update the contact force
-                    if g.dim < self._Nd:
-                        if name == self.contact_traction_variable:
-                            contact = solution_vector[dof[bi] : dof[bi + 1]]
-                            data = self.gb.node_props(g)
-                            data[pp.STATE][pp.ITERATE][
-                                self.contact_traction_variable
-                            ] = contact.copy()
+                            self.contact_traction_variable
+                        ] = contact.copy()
 
     def _set_friction_coefficient(self, g: pp.Grid) -> np.ndarray:
         """The friction coefficient is uniform, and equal to 1."""
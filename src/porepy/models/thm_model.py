@@ -684,37 +684,28 @@ class THM(parent_model.ContactMechanicsBiot):
         """
         super()._update_iterate(solution_vector)
         assembler = self.assembler
-        variable_names = []
-        for pair in assembler.block_dof.keys():
-            variable_names.append(pair[1])
-
-        dof = np.cumsum(np.append(0, np.asarray(assembler.full_dof)))
-
-        for var_name in set(variable_names):
-            for pair, bi in assembler.block_dof.items():
-                g = pair[0]
-                name = pair[1]
-                if name != var_name:
-                    continue
-                if isinstance(g, tuple):
-                    # This is really an edge
-                    if name == self.mortar_scalar_variable:
-                        mortar_p = solution_vector[dof[bi] : dof[bi + 1]]
-                        data = self.gb.edge_props(g)
-                        data[pp.STATE][pp.ITERATE][
-                            self.mortar_scalar_variable
-                        ] = mortar_p.copy()
-                else:
-                    data = self.gb.node_props(g)
 
-                    # g is a node (not edge)
-
-                    # For the fractures, update the contact force
-                    if name == self.scalar_variable:
-                        p = solution_vector[dof[bi] : dof[bi + 1]]
-                        data = self.gb.node_props(g)
-                        data[pp.STATE][pp.ITERATE][self.scalar_variable] = p.copy()
-                    elif name == self.temperature_variable:
-                        T = solution_vector[dof[bi] : dof[bi + 1]]
-                        data = self.gb.node_props(g)
-                        data[pp.STATE][pp.ITERATE][self.temperature_variable] = T.copy()
+        # Each block is visited once; the variable name is checked in the loop body.
+        for g, name in assembler.block_dof:
+            if isinstance(g, tuple):
+                # This is really an edge
+                if name == self.mortar_scalar_variable:
+                    mortar_p = solution_vector[assembler.dof_range(g, name)]
+                    data = self.gb.edge_props(g)
+                    data[pp.STATE][pp.ITERATE][
+                        self.mortar_scalar_variable
+                    ] = mortar_p.copy()
+            else:
+                data = self.gb.node_props(g)
+
+                # g is a node (not edge)
+
+                # For the fractures, update the contact force
+                if name == self.scalar_variable:
+                    p = solution_vector[assembler.dof_range(g, name)]
+                    data = self.gb.node_props(g)
+                    data[pp.STATE][pp.ITERATE][self.scalar_variable] = p.copy()
+                elif name == self.temperature_variable:
+                    T = solution_vector[assembler.dof_range(g, name)]
+                    data = self.gb.node_props(g)
+                    data[pp.STATE][pp.ITERATE][self.temperature_variable] = T.copy()
@@ -883,14 +883,15 @@ def vector_divergence(g: pp.Grid) -> sps.csr_matrix:
     vector_div (sparse csr matrix), dimensions: nd * (num_cells, num_faces)
     """
     # Scalar divergence
-    scalar_div = g.cell_faces
+    scalar_div = g.cell_faces.transpose()
 
-    # Vector extension, convert to coo-format to avoid odd errors when one
-    # grid dimension is 1 (this may return a bsr matrix)
+    # Vector extension. Since the identity is symmetric, the Kronecker product of
+    # the transposed cell-face relation equals the transpose of the Kronecker
+    # product, thus the matrix can be formed directly on csr format without
+    # further conversions. Specify the format explicitly to avoid odd errors when
+    # one grid dimension is 1 (this may return a bsr matrix).
     # The order of arguments to sps.kron is important.
-    block_div = sps.kron(scalar_div, sps.eye(g.dim)).tocsc()
-
-    return block_div.transpose().tocsr()
+    return sps.kron(scalar_div, sps.eye(g.dim), format="csr")
 
 
 def scalar_tensor_vector_prod(
@@ -201,14 +201,33 @@ class Assembler:
         # the matrix to a sps. block matrix.
         if add_matrices:
             size = np.sum(self.full_dof)
-            full_matrix = sps_matrix((size, size))
             full_rhs = np.zeros(size)
 
-            for mat in matrix.values():
-                full_matrix += sps.bmat(mat, matrix_format)
+            # Add the matrices of the different terms block by block, and form
+            # the global matrix only once. This avoids building (and adding) a
+            # full size sparse matrix for each term.
+            if len(matrix) > 0:
+                num_blocks = self.full_dof.size
+                sum_matrix = np.empty((num_blocks, num_blocks), dtype=object)
+                for mat in matrix.values():
+                    for ri, ci in np.ndindex(*mat.shape):
+                        block = mat[ri, ci]
+                        if block is None:
+                            continue
+                        if sum_matrix[ri, ci] is None:
+                            sum_matrix[ri, ci] = block
+                        else:
+                            sum_matrix[ri, ci] = sum_matrix[ri, ci] + block
+                full_matrix = sps.bmat(sum_matrix, matrix_format)
+            else:
+                full_matrix = sps_matrix((size, size))
 
+            # Add the right hand side blocks directly into the global vector, this
+            # avoids forming a full size temporary vector per term.
+            dof = self._dof_start
             for vec in rhs.values():
-                full_rhs += np.concatenate(tuple(vec))
+                for bi, loc_rhs in enumerate(vec):
+                    full_rhs[dof[bi] : dof[bi + 1]] += loc_rhs
 
             return full_matrix, full_rhs
 
@@ -947,9 +966,12 @@ class Assembler:
         # Dictionary that maps node/edge + variable combination to an index.
         block_dof: Dict[Tuple[Union[pp.Grid, Tuple[pp.Grid, pp.Grid]], str], int] = {}
 
-        # Storage for number of dofs per variable per node/edge, with respect
-        # to the ordering specified in block_dof
-        full_dof: List[int] = []
+        # Storage for the number of grid entities (cells, faces, nodes) and the number
+        # of dofs per entity for each variable per node/edge, with respect to the
+        # ordering specified in block_dof. The number of dofs per block is computed
+        # from these after the loops.
+        num_entities: List[Tuple[int, int, int]] = []
+        dofs_per_entity: List[Tuple[int, int, int]] = []
 
         # Store all combinations of variable pairs (e.g. row-column indices in
         # the global system matrix), and identifiers of discretization operations
@@ -975,10 +997,12 @@ class Assembler:
         for g, d in self.gb:
 
             # Loop over variables, count dofs and identify variable-term
-            # combinations internal to the node
-            if self._local_variables(d) is None:
+            # combinations internal to the node. The variables are fetched once,
+            # and reused in the nested loop over variable pairs below.
+            local_variables = self._local_variables(d)
+            if local_variables is None:
                 continue
-            for local_var, local_dofs in self._local_variables(d).items():
+            for local_var, local_dofs in local_variables.items():
 
                 # First assign a block index.
                 # Note that the keys in the dictionary is a tuple, with a grid
@@ -986,20 +1010,23 @@ class Assembler:
                 block_dof[(g, local_var)] = block_dof_counter
                 block_dof_counter += 1
 
-                # Count number of dofs for this variable on this grid and store it.
+                # Store the information needed to count the number of dofs for this
+                # variable on this grid.
                 # The number of dofs for each grid entitiy type defaults to zero.
-                total_local_dofs = (
-                    g.num_cells * local_dofs.get("cells", 0)
-                    + g.num_faces * local_dofs.get("faces", 0)
-                    + g.num_nodes * local_dofs.get("nodes", 0)
+                num_entities.append((g.num_cells, g.num_faces, g.num_nodes))
+                dofs_per_entity.append(
+                    (
+                        local_dofs.get("cells", 0),
+                        local_dofs.get("faces", 0),
+                        local_dofs.get("nodes", 0),
+                    )
                 )
-                full_dof.append(total_local_dofs)
 
                 # Next, identify all defined discretization terms for this variable.
                 # Do a second loop over the variables of the grid, the combination
                 # of the two variables gives us all coupling terms (e.g. an off-diagonal
                 # block in the global matrix)
-                for other_local_var in self._local_variables(d):
+                for other_local_var in local_variables:
                     # We need to identify identify individual discretization terms
                     # defined for this equation. These are identified either by
                     # the variable k (for variable dependence on itself), or the
@@ -1038,9 +1065,10 @@ class Assembler:
         for e, d in self.gb.edges():
             mg: pp.MortarGrid = d["mortar_grid"]
 
-            if self._local_variables(d) is None:
+            local_variables = self._local_variables(d)
+            if local_variables is None:
                 continue
-            for local_var, local_dofs in self._local_variables(d).items():
+            for local_var, local_dofs in local_variables.items():
 
                 # First count the number of dofs per variable. Note that the
                 # identifier here is a tuple of the edge and a variable str.
@@ -1049,11 +1077,11 @@ class Assembler:
 
                 # We only allow for cell variables on the mortar grid.
                 # This will not change in the foreseeable future
-                total_local_dofs = mg.num_cells * local_dofs.get("cells", 0)
-                full_dof.append(total_local_dofs)
+                num_entities.append((mg.num_cells, 0, 0))
+                dofs_per_entity.append((local_dofs.get("cells", 0), 0, 0))
 
                 # Then identify all discretization terms for this variable
-                for other_local_var in self._local_variables(d).keys():
+                for other_local_var in local_variables.keys():
                     merged_vars = self._discretization_key(local_var, other_local_var)
                     discr = d.get(pp.DISCRETIZATION, None)
                     if discr is None:
@@ -1121,11 +1149,19 @@ class Assembler:
                     )
                 )
         # Array version of the number of dofs per node/edge and variable
-        self.full_dof: np.ndarray = np.array(full_dof)
+        self.full_dof: np.ndarray = self._count_dofs(num_entities, dofs_per_entity)
+        # Offsets of the blocks in the global system. Stored to avoid recomputing
+        # the cumulative sum in every call to dof_ind().
+        self._dof_start: np.ndarray = np.hstack((0, np.cumsum(self.full_dof)))
         self.block_dof: Dict[
             Tuple[Union[pp.Grid, Tuple[pp.Grid, pp.Grid]], str], int
         ] = block_dof
         self.variable_combinations: List[str] = variable_combinations
+        # Uniquify the variable combinations once, rather than in every assembly.
+        # Use a dictionary to preserve the order of first appearance.
+        self._unique_variable_combinations: List[str] = list(
+            dict.fromkeys(variable_combinations)
+        )
         self._grid_variable_term_combinations = grid_variable_term_combinations
 
     def update_dof_count(self) -> None:
@@ -1141,6 +1177,10 @@ class Assembler:
         is to define a new assembler object.
 
         """
+        num_blocks = len(self.block_dof)
+        num_entities: List[Tuple[int, int, int]] = [(0, 0, 0)] * num_blocks
+        dofs_per_entity: List[Tuple[int, int, int]] = [(0, 0, 0)] * num_blocks
+
         # Loop over identified grid-varibale combinations
         for key, index in self.block_dof.items():
             # Grid quantity (grid or interface), and variable
@@ -1153,18 +1193,46 @@ class Assembler:
                 # Also fetch mortar grid
                 grid = d["mortar_grid"]
 
-            # Dofs related to cell
             dof: Dict[str, int] = d[pp.PRIMARY_VARIABLES][variable]
-            num_dofs: int = grid.num_cells * dof.get("cells", 0)  # type: ignore
 
             if isinstance(grid, pp.Grid):
-                # Add dofs on faces and nodes, but not on interfaces
-                num_dofs += grid.num_faces * dof.get(
-                    "faces", 0
-                ) + grid.num_nodes * dof.get("nodes", 0)
+                num_entities[index] = (grid.num_cells, grid.num_faces, grid.num_nodes)
+                dofs_per_entity[index] = (
+                    dof.get("cells", 0),
+                    dof.get("faces", 0),
+                    dof.get("nodes", 0),
+                )
+            else:
+                # Only dofs related to cells on interfaces
+                num_entities[index] = (grid.num_cells, 0, 0)  # type: ignore
+                dofs_per_entity[index] = (dof.get("cells", 0), 0, 0)
+
+        # Update local counting
+        self.full_dof[:] = self._count_dofs(num_entities, dofs_per_entity)
+
+        # The block offsets must follow the updated dof count
+        self._dof_start = np.hstack((0, np.cumsum(self.full_dof)))
 
-            # Update local counting
-            self.full_dof[index] = num_dofs
+    @staticmethod
+    def _count_dofs(
+        num_entities: List[Tuple[int, int, int]],
+        dofs_per_entity: List[Tuple[int, int, int]],
+    ) -> np.ndarray:
+        """Count the number of dofs per block.
+
+        Parameters:
+            num_entities (list of tuples): Number of cells, faces and nodes of the
+                grid (or mortar grid) of each block.
+            dofs_per_entity (list of tuples): Number of dofs per cell, face and node
+                of the variable of each block.
+
+        Returns:
+            np.ndarray of int: Number of dofs per block.
+
+        """
+        num = np.array(num_entities, dtype=int).reshape((-1, 3))
+        dofs = np.array(dofs_per_entity, dtype=int).reshape((-1, 3))
+        return np.sum(num * dofs, axis=1)
 
     def _initialize_matrix_rhs(
         self, sps_matrix: Type[csc_or_csr_matrix]
@@ -1206,9 +1274,9 @@ class Assembler:
 
         num_blocks = len(self.full_dof)
 
-        # Uniquify list of variable combinations. Then iterate over all variable
-        # combinations and initialize matrices of the right size
-        for var in list(set(self.variable_combinations)):
+        # Iterate over all unique variable combinations and initialize matrices of
+        # the right size
+        for var in self._unique_variable_combinations:
 
             # Generate a block matrix
             matrix_dict[var] = np.empty((num_blocks, num_blocks), dtype=np.object)
@@ -1347,29 +1415,28 @@ class Assembler:
                 will be distributed
 
         """
+        dof = self._dof_start
+
+        # A single pass over the blocks, with constant time look up of the variable
+        # names, rather than one pass per variable.
         if variable_names is None:
-            variable_names = []
-            for pair in self.block_dof.keys():
-                variable_names.append(pair[1])
-
-        dof = np.cumsum(np.append(0, np.asarray(self.full_dof)))
-
-        for var_name in set(variable_names):
-            for pair, bi in self.block_dof.items():
-                g = pair[0]
-                name = pair[1]
-                if name != var_name:
-                    continue
-                if isinstance(g, tuple):
-                    # This is really an edge
-                    data = self.gb.edge_props(g)
-                else:
-                    data = self.gb.node_props(g)
+            names: Set[str] = {pair[1] for pair in self.block_dof.keys()}
+        else:
+            names = set(variable_names)
 
-                if pp.STATE in data.keys():
-                    data[pp.STATE][var_name] = values[dof[bi] : dof[bi + 1]]
-                else:
-                    data[pp.STATE] = {var_name: values[dof[bi] : dof[bi + 1]]}
+        for (g, var_name), bi in self.block_dof.items():
+            if var_name not in names:
+                continue
+            if isinstance(g, tuple):
+                # This is really an edge
+                data = self.gb.edge_props(g)
+            else:
+                data = self.gb.node_props(g)
+
+            if pp.STATE in data.keys():
+                data[pp.STATE][var_name] = values[dof[bi] : dof[bi + 1]]
+            else:
+                data[pp.STATE] = {var_name: values[dof[bi] : dof[bi + 1]]}
 
     def dof_ind(
         self, g: Union[pp.Grid, Tuple[pp.Grid, pp.Grid]], name: str
@@ -1387,8 +1454,27 @@ class Assembler:
 
         """
         block_ind = self.block_dof[(g, name)]
-        dof_start = np.hstack((0, np.cumsum(self.full_dof)))
-        return np.arange(dof_start[block_ind], dof_start[block_ind + 1])
+        return np.arange(self._dof_start[block_ind], self._dof_start[block_ind + 1])
+
+    def dof_range(self, g: Union[pp.Grid, Tuple[pp.Grid, pp.Grid]], name: str) -> slice:
+        """Get the range in the global system of variables associated with a
+        given node / edge (in the GridBucket sense) and a given variable.
+
+        The degrees of freedom of a block are contiguous in the global system, thus
+        the slice can be used for indexing without forming the index array
+        returned by dof_ind().
+
+        Parameters:
+            g (pp.Grid or pp.GridBucket edge): Either a grid, or an edge in the
+                GridBucket.
+            name (str): Name of a variable. Should be an active variable.
+
+        Returns:
+            slice: Range of degrees of freedom for this variable.
+
+        """
+        block_ind = self.block_dof[(g, name)]
+        return slice(self._dof_start[block_ind], self._dof_start[block_ind + 1])
 
     def num_dof(self) -> int:
         """Get total number of unknowns of the identified variables.
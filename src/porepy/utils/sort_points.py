@@ -2,6 +2,7 @@
 """
 from typing import Optional, Tuple, Union
 
+import numba
 import numpy as np
 
 import porepy as pp
@@ -18,8 +19,9 @@ def sort_point_pairs(
     The target application is to sort lines, defined by their
     start end endpoints, so that they form a continuous polyline.
 
-    The algorithm is brute-force, using a double for-loop. This can
-    surely be imporved.
+    The chain is formed by walking from line to line through their shared points.
+    If several lines connect to a point, the one with the lowest column index is
+    chosen.
 
     Parameters:
     lines: np.ndarray, 2xn, the line pairs. If lines has more than 2 rows, we assume
@@ -74,35 +76,27 @@ def sort_point_pairs(
         # Start with the first line in input
         sorted_lines[:, 0] = lines[:, 0]
         found[0] = True
+
+    # Represent the points by consecutive indices, to allow for a compact lookup of
+    # the lines attached to each point.
+    point_ind, pairs = np.unique(lines[:2], return_inverse=True)
+    pairs = pairs.reshape((2, num_lines)).astype(np.int64)
     # The starting point for the next line
-    prev = sorted_lines[1, 0]
+    prev = np.searchsorted(point_ind, sorted_lines[1, 0])
+
+    # Walk along the chain. For each found line, store its column index, and whether
+    # it was found in its original (is_ordered) or flipped orientation.
+    sort_ind[1:], flipped, is_ordered, num_sorted = _chain_point_pairs(
+        pairs, point_ind.size, found, prev
+    )
+    found[sort_ind[1:num_sorted]] = True
+    sorted_lines[:, 1:num_sorted] = lines[:, sort_ind[1:num_sorted]]
+    flip_ind = 1 + np.flatnonzero(flipped[: num_sorted - 1])
+    sorted_lines[:2, flip_ind] = sorted_lines[1::-1, flip_ind]
 
     # Order of the origin line list, store if they are flipped or not to form the chain
-    is_ordered = np.zeros(num_lines, dtype=np.bool)
     is_ordered[0] = True
 
-    # The sorting algorithm: Loop over all places in sorted_line to be filled,
-    # for each of these, loop over all members in lines, check if the line is still
-    # a candidate, and if one of its points equals the current starting point.
-    # More efficient and more elegant approaches can surely be found, but this
-    # will do for now.
-    for i in range(1, num_lines):  # The first line has already been found
-        for j in range(0, num_lines):
-            if not found[j] and lines[0, j] == prev:
-                sorted_lines[:, i] = lines[:, j]
-                found[j] = True
-                prev = lines[1, j]
-                is_ordered[j] = True
-                sort_ind[i] = j
-
-                break
-            elif not found[j] and lines[1, j] == prev:
-                sorted_lines[:, i] = lines[:, j]
-                sorted_lines[:2, i] = np.flip(sorted_lines[:2, i], 0)
-                found[j] = True
-                prev = lines[0, j]
-                sort_ind[i] = j
-                break
     # By now, we should have used all lines
     assert np.all(found)
     if check_circular:
@@ -112,6 +106,84 @@ def sort_point_pairs(
     return sorted_lines, sort_ind
 
 
+@numba.njit(cache=True)
+def _chain_point_pairs(pairs, num_points, found, start):
+    """Walk through a set of point pairs, to form a chain.
+
+    Helper function for sort_point_pairs.
+
+    Parameters:
+        pairs (np.ndarray of int, 2 x num_lines): The line pairs, with the points
+            indexed 0, ..., num_points - 1.
+        num_points (int): Number of points.
+        found (np.ndarray of bool, num_lines): Lines that are already part of the
+            chain, and should not be visited. Not modified.
+        start (int): Point from which to start the walk.
+
+    Returns:
+        np.ndarray of int, num_lines - 1: Column index of the lines, in the order
+            they were found. Only the first num_sorted - 1 elements are valid.
+        np.ndarray of bool, num_lines - 1: True if the corresponding line must be
+            flipped to fit into the chain.
+        np.ndarray of bool, num_lines: True for lines which were found in their
+            original orientation.
+        int: Number of lines in the chain, including those already found on input.
+
+    """
+    num_lines = pairs.shape[1]
+
+    # Lines attached to each point, stored in a compressed format. The lines of a
+    # point are sorted by their column index.
+    offsets = np.zeros(num_points + 1, dtype=np.int64)
+    for j in range(num_lines):
+        offsets[pairs[0, j] + 1] += 1
+        if pairs[1, j] != pairs[0, j]:
+            offsets[pairs[1, j] + 1] += 1
+    for pi in range(num_points):
+        offsets[pi + 1] += offsets[pi]
+    lines_of_point = np.empty(offsets[-1], dtype=np.int64)
+    position = offsets[:-1].copy()
+    for j in range(num_lines):
+        lines_of_point[position[pairs[0, j]]] = j
+        position[pairs[0, j]] += 1
+        if pairs[1, j] != pairs[0, j]:
+            lines_of_point[position[pairs[1, j]]] = j
+            position[pairs[1, j]] += 1
+
+    is_found = found.copy()
+    sort_ind = np.zeros(num_lines - 1, dtype=np.int64)
+    flipped = np.zeros(num_lines - 1, dtype=np.bool_)
+    is_ordered = np.zeros(num_lines, dtype=np.bool_)
+
+    # Reuse the offsets as pointers to the first line of each point that may still
+    # be unvisited.
+    first_unvisited = offsets[:-1].copy()
+
+    prev = start
+    num_sorted = 1
+    for i in range(num_lines - 1):
+        pos = first_unvisited[prev]
+        while pos < offsets[prev + 1] and is_found[lines_of_point[pos]]:
+            pos += 1
+        first_unvisited[prev] = pos
+        if pos == offsets[prev + 1]:
+            # The chain is broken
+            break
+
+        j = lines_of_point[pos]
+        is_found[j] = True
+        sort_ind[i] = j
+        if pairs[0, j] == prev:
+            prev = pairs[1, j]
+            is_ordered[j] = True
+        else:
+            prev = pairs[0, j]
+            flipped[i] = True
+        num_sorted += 1
+
+    return sort_ind, flipped, is_ordered, num_sorted
+
+
 def sort_point_plane(
     pts: np.ndarray,
     centre: np.ndarray,
@@ -72,6 +72,27 @@ class AdTest(unittest.TestCase):
         self.assertTrue(a.val == 3 and a.jac == 2)
         self.assertTrue(b == 3)
 
+    def test_add_sub_var_with_vector(self):
+        J = sps.csc_matrix(np.array([[1, 2], [0, 3]]))
+        a = Ad_array(np.array([1, 2]), J)
+        b = np.array([3, 5])
+
+        c = a + b
+        self.assertTrue(np.allclose(c.val, [4, 7]))
+        self.assertTrue(np.allclose(c.jac.A, J.A))
+        c = a - b
+        self.assertTrue(np.allclose(c.val, [-2, -3]))
+        self.assertTrue(np.allclose(c.jac.A, J.A))
+        c = 3 - a
+        self.assertTrue(np.allclose(c.val, [2, 1]))
+        self.assertTrue(np.allclose(c.jac.A, -J.A))
+
+        # The Jacobian of the result should not share memory with the operand
+        c = a + b
+        c.jac.data[:] = 0
+        self.assertTrue(np.allclose(a.jac.A, np.array([[1, 2], [0, 3]])))
+        self.assertTrue(np.allclose(a.val, [1, 2]))
+
     def test_mul_scal_ad_scal(self):
         a = Ad_array(3, 0)
         b = Ad_array(2, 0)
@@ -1637,6 +1637,63 @@ class TestAssembler(unittest.TestCase):
         self.assertTrue(variable_name_1 in var)
         self.assertFalse(variable_name_2 in var)
 
+    def test_dof_ind_and_range(self):
+        # Two nodes with different variables, and an edge between the nodes.
+        # Check that dof_ind and dof_range give the same, contiguous dofs.
+        gb = self.define_gb()
+        variable_name_1 = "var_1"
+        variable_name_2 = "var_2"
+        for g, d in gb:
+            if g.grid_num == 1:
+                d[pp.PRIMARY_VARIABLES] = {
+                    variable_name_1: {"cells": 1},
+                    variable_name_2: {"cells": 2},
+                }
+            else:
+                d[pp.PRIMARY_VARIABLES] = {variable_name_1: {"cells": 1}}
+
+        for e, d in gb.edges():
+            d[pp.PRIMARY_VARIABLES] = {variable_name_1: {"cells": 1}}
+
+        assembler = pp.Assembler(gb)
+        x = np.arange(assembler.num_dof())
+
+        covered = []
+        for (g, var), bi in assembler.block_dof.items():
+            ind = assembler.dof_ind(g, var)
+            self.assertEqual(ind.size, assembler.full_dof[bi])
+            self.assertTrue(np.all(x[ind] == x[assembler.dof_range(g, var)]))
+            covered.append(ind)
+        self.assertTrue(np.all(np.sort(np.hstack(covered)) == x))
+
+    def test_update_dof_count(self):
+        # Change the number of dofs per cell of a variable, check that the dof
+        # count and the dof indices are updated.
+        gb = self.define_gb()
+        variable_name_1 = "var_1"
+        variable_name_2 = "var_2"
+        for g, d in gb:
+            d[pp.PRIMARY_VARIABLES] = {
+                variable_name_1: {"cells": 1},
+                variable_name_2: {"faces": 1},
+            }
+            if g.grid_num == 1:
+                g1 = g
+        for e, d in gb.edges():
+            d[pp.PRIMARY_VARIABLES] = {variable_name_1: {"cells": 1}}
+
+        assembler = pp.Assembler(gb)
+        self.assertEqual(assembler.num_dof(), 2 * (1 + 4) + 1)
+
+        gb.node_props(g1)[pp.PRIMARY_VARIABLES][variable_name_1]["cells"] = 3
+        gb.edge_props(e)[pp.PRIMARY_VARIABLES][variable_name_1]["cells"] = 2
+        assembler.update_dof_count()
+
+        self.assertEqual(assembler.num_dof(), (3 + 4) + (1 + 4) + 2)
+        self.assertEqual(assembler.dof_ind(g1, variable_name_1).size, 3)
+        self.assertEqual(assembler.dof_ind(e, variable_name_1).size, 2)
+        self.assertEqual(assembler.dof_ind(e, variable_name_1)[-1], 13)
+
     def test_str_repr_two_nodes_different_variables(self):
         # Assign two variables, check that the string returned by __str__ and
         # __repr__ contain the correct information
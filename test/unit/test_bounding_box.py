@@ -0,0 +1,29 @@
+import unittest
+
+import numpy as np
+
+import porepy as pp
+
+
+class TestBoundingBox(unittest.TestCase):
+    def test_from_points(self):
+        p = np.array([[0, 2, 1], [1, -1, 0]])
+        domain = pp.bounding_box.from_points(p)
+
+        self.assertTrue(domain == {"xmin": 0, "xmax": 2, "ymin": -1, "ymax": 1})
+
+    def test_from_point_sets(self):
+        p0 = np.array([[0, 2, 1], [1, -1, 0], [0, 0, 3]])
+        p1 = np.array([[4], [5], [6]])
+        p2 = np.array([[-1, 1], [0, 0], [1, 2]])
+        min_coord, max_coord = pp.bounding_box.from_point_sets([p0, p1, p2])
+
+        known_min = np.array([[0, 4, -1], [-1, 5, 0], [0, 6, 1]])
+        known_max = np.array([[2, 4, 1], [1, 5, 0], [3, 6, 2]])
+
+        self.assertTrue(np.allclose(min_coord, known_min))
+        self.assertTrue(np.allclose(max_coord, known_max))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -97,6 +97,16 @@ class TestCCW(unittest.TestCase):
             )
         )
 
+    def test_ccw_polygon(self):
+        poly = np.array([[0, 1, 1, 0], [0, 0, 1, 1]])
+        self.assertTrue(pp.geometry_property_checks.is_ccw_polygon(poly))
+        self.assertTrue(not pp.geometry_property_checks.is_ccw_polygon(poly[:, ::-1]))
+
+    def test_ccw_polygon_non_convex(self):
+        poly = np.array([[0, 2, 2, 1, 0], [0, 0, 2, 0.5, 2]])
+        self.assertTrue(pp.geometry_property_checks.is_ccw_polygon(poly))
+        self.assertTrue(not pp.geometry_property_checks.is_ccw_polygon(poly[:, ::-1]))
+
 
 if __name__ == "__main__":
     unittest.main()
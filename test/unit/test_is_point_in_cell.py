@@ -130,6 +130,26 @@ class BasicsTest(unittest.TestCase):
         pt = np.array([1.1, -0.1, 0])
         self.assertTrue(not pp.geometry_property_checks.point_in_cell(pts, pt))
 
+    def test_planar_concave_several_points(self):
+        pts = np.array(
+            [[0, 0.5, 1, 0.4, 0.5, -0.2], [0, 0, 0, 1, 1.2, 1], [0, 0, 0, 0, 0, 0]],
+            dtype=float,
+        )
+        p = np.array(
+            [[0.2, 0.5, 1.3, -0.1, 1.1], [0.3, 1, 0.5, 0.5, -0.1], [0, 0, 0, 0, 0]]
+        )
+        known = np.array([1, 0, 0, 0, 0], dtype=bool)
+
+        is_inside = pp.geometry_property_checks.points_in_cell(pts, p)
+        self.assertTrue(np.all(is_inside == known))
+
+        # The batched version should agree with the single point version
+        for pi in range(p.shape[1]):
+            self.assertTrue(
+                pp.geometry_property_checks.point_in_cell(pts, p[:, pi])
+                == is_inside[pi]
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
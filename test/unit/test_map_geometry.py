@@ -46,3 +46,15 @@ class TestNormalVector(unittest.TestCase):
 
         with self.assertRaises(RuntimeError):
             _ = pp.map_geometry.compute_normal(pts)
+
+
+class TestNormals1d(unittest.TestCase):
+    def test_normals_1d(self):
+        pts = np.array([[0, 1, 2], [0, 2, 4], [0, 1, 2]], dtype=float)
+        normals = pp.map_geometry.compute_normals_1d(pts)
+        tangent = pp.map_geometry.compute_tangent(pts)
+
+        self.assertTrue(normals.shape == (3, 2))
+        # The normals should be orthonormal, and orthogonal to the line
+        self.assertTrue(np.allclose(normals.T.dot(normals), np.eye(2)))
+        self.assertTrue(np.allclose(tangent.dot(normals), 0))
@@ -102,6 +102,32 @@ class BasicTest(unittest.TestCase):
         self.assertTrue(np.allclose(new_lines, lines_known))
         self.assertTrue(np.allclose(lines_kept, kept_known))
 
+    def test_non_convex_polygon_line_touches_boundary(self):
+        # non-convex polygon
+        polygon = np.array(
+            [[0.0, 0.5, 0.75, 1.0, 1.5, 1.5, 0], [0.0, 0.0, 0.25, 0.0, 0, 1, 1]]
+        )
+        # The first line starts in a vertex of the polygon, passes outside the polygon
+        # and then enters it. The second touches the polygon boundary from the inside,
+        # and is split in two. The third lies on the boundary, and is kicked out.
+        pts = np.array(
+            [[1.0, 0.0, 1.25, 0.0, 0.5, 0.75], [0.0, 0.5, 0.25, 0.25, 0.0, 0.25]]
+        )
+        lines = np.array([[0, 2, 4], [1, 3, 5]])
+
+        new_pts, new_lines, lines_kept = pp.constrain_geometry.lines_by_polygon(
+            polygon, pts, lines
+        )
+        pts_known = np.array(
+            [[2 / 3, 0.0, 1.25, 0.75, 0.75, 0.0], [1 / 6, 0.5, 0.25, 0.25, 0.25, 0.25]]
+        )
+        lines_known = np.array([[0, 2, 4], [1, 3, 5]])
+        kept_known = np.array([0, 1, 1])
+
+        self.assertTrue(np.allclose(new_pts, pts_known))
+        self.assertTrue(np.allclose(new_lines, lines_known))
+        self.assertTrue(np.allclose(lines_kept, kept_known))
+
 
 class TestIntersectionPolygonsEmbeddedIn3d(unittest.TestCase):
     def test_single_fracture(self):
@@ -980,6 +1006,16 @@ class TestPolygonPolyhedronIntersection(unittest.TestCase):
         )
         self.assertTrue(len(constrained_poly) == 0)
 
+    def test_poly_in_plane_of_side(self):
+        # The polygon lies in the plane of the west side, partly outside the box.
+        # This is not covered by the constraining algorithm, and should be reported,
+        # rather than giving a polygon with vertexes outside the box.
+        poly = np.array(
+            [[0, 0, 0, 0], [-0.67, 0.17, 0.17, -0.67], [0.08, 0.08, 0.92, 0.92]]
+        )
+        with self.assertRaises(NotImplementedError):
+            pp.constrain_geometry.polygons_by_polyhedron(poly, self.cart_polyhedron)
+
     def test_poly_intersects_all_sides(self):
         # Polygon extends outside on all sides
 
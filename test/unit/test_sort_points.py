@@ -53,6 +53,19 @@ class SortLinePairTest(unittest.TestCase):
         self.assertTrue(test_utils.compare_arrays(sp, known_lines))
         self.assertTrue(np.allclose(known_sort_ind, sort_ind))
 
+    def test_flipped_lines_and_extra_rows(self):
+        # Lines are both permuted and flipped, extra rows should follow the lines
+        p = np.array([[1, 2, 10], [1, 5, 11], [7, 2, 12], [7, 5, 13]]).T
+        sp, sort_ind, is_ordered = sort_points.sort_point_pairs(p, ordering=True)
+
+        known_lines = np.array([[1, 2, 10], [2, 7, 12], [7, 5, 13], [5, 1, 11]]).T
+        known_sort_ind = np.array([0, 2, 3, 1])
+        known_is_ordered = np.array([True, False, False, True])
+
+        self.assertTrue(np.allclose(known_lines, sp))
+        self.assertTrue(np.allclose(known_sort_ind, sort_ind))
+        self.assertTrue(np.all(known_is_ordered == is_ordered))
+
 
 class TestSortPointPlane(unittest.TestCase):
     def test_points_already_in_xy_plane(self):